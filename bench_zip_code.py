@@ -0,0 +1,158 @@
+"""
+Замеры скорости поиска в zip_code_ex6.
+
+Запуск из корня репозитория:
+
+    python bench_zip_code.py
+"""
+import random
+import time
+import tracemalloc
+
+import utils.zip_util
+import zip_code_ex6
+
+# записи списками, как их перебирал код до индексов (а не представления ZipDataset)
+zip_records = utils.zip_util.read_zip_all()
+
+
+def scan_find_by_zip(zip_code):
+    """Поиск перебором всех записей — как до индексов."""
+    for code in zip_records:
+        if code[0] == zip_code:
+            return code
+    return None
+
+
+def scan_find_by_city(city, state):
+    """Поиск перебором всех записей — как до индексов."""
+    result = []
+    for data in zip_records:
+        if data[3].lower() == city.lower() and data[4].lower() == state.lower():
+            result.append(data[0])
+    return result
+
+
+def scan_find_nearest(lat, lon, k=5):
+    """Ближайшие индексы перебором всех записей с формулой Хаверсина."""
+    distances = [(zip_code_ex6.distance_haversine_formula(lat, lon, rec[1], rec[2]), rec[0])
+                 for rec in zip_records]
+    return sorted(distances)[:k]
+
+
+def scan_find_within_radius(zip_code, radius):
+    """Индексы в радиусе перебором всех записей с формулой Хаверсина."""
+    rec = zip_code_ex6.find_by_zip(zip_code)
+    distances = [(zip_code_ex6.distance_haversine_formula(rec[1], rec[2], other[1], other[2]), other[0])
+                 for other in zip_records]
+    return sorted(d for d in distances if d[0] <= radius)
+
+
+def queries_per_second(func, queries, min_time=0.5):
+    """
+    Замеряет пропускную способность функции поиска.
+
+    :param func: функция поиска
+    :param queries: list, кортежи аргументов func
+    :param min_time: float, минимальная длительность замера в секундах
+    :return: float, число запросов в секунду
+    """
+    done = 0
+    start = time.perf_counter()
+    while True:
+        for args in queries:
+            func(*args)
+        done += len(queries)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return done / elapsed
+
+
+def main():
+    rnd = random.Random(1)
+    records = rnd.sample(zip_records, 200)
+    zips = [(rec[0],) for rec in records]
+    cities = [(rec[3].upper(), rec[4].lower()) for rec in records]
+
+    points = [(rec[1] + 0.01, rec[2] - 0.01, 10) for rec in records]
+    radii = [(rec[0], 25) for rec in records]
+
+    cases = [
+        ('find_by_zip', scan_find_by_zip, zip_code_ex6.find_by_zip, zips),
+        ('find_by_city', scan_find_by_city, zip_code_ex6.find_by_city, cities),
+        ('find_nearest', scan_find_nearest, zip_code_ex6.find_nearest, points),
+        ('find_within_radius', scan_find_within_radius, zip_code_ex6.find_within_radius, radii),
+    ]
+    print(f'{"запрос":<20}{"перебор, зап/с":>18}{"индекс, зап/с":>18}{"ускорение":>12}')
+    for name, before, after, queries in cases:
+        slow = queries_per_second(before, queries[:5])
+        fast = queries_per_second(after, queries)
+        print(f'{name:<20}{slow:>18,.0f}{fast:>18,.0f}{fast / slow:>11,.0f}x')
+
+    bench_distances()
+    bench_memory()
+
+
+def best_time(func, repeat=5):
+    """
+    :param func: замеряемая функция без аргументов
+    :param repeat: int, число запусков
+    :return: float, лучшее время одного запуска в секундах
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_distances(size=2000):
+    """
+    Сравнивает расчёт расстояний по парам индексов в цикле и пакетом.
+
+    :param size: int, число пар; матрица строится для 200 из них на все индексы
+    """
+    rnd = random.Random(2)
+    first = [rec[0] for rec in rnd.sample(zip_records, size)]
+    second = [rec[0] for rec in rnd.sample(zip_records, size)]
+
+    def scalar_loop():
+        for z1, z2 in zip(first, second):
+            r1, r2 = zip_code_ex6.find_by_zip(z1), zip_code_ex6.find_by_zip(z2)
+            zip_code_ex6.distance_haversine_formula(r1[1], r1[2], r2[1], r2[2])
+
+    columns = [rec[0] for rec in zip_records]
+    loop = best_time(scalar_loop) / size
+    vector = best_time(lambda: zip_code_ex6.distance_vector(first, second)) / size
+    matrix = best_time(lambda: zip_code_ex6.distance_matrix(first[:200], columns)) / (200 * len(columns))
+
+    print(f'\nрасстояние на пару: цикл {loop * 1e9:,.0f} нс, distance_vector {vector * 1e9:,.0f} нс, '
+          f'distance_matrix {matrix * 1e9:,.0f} нс')
+
+
+def traced_size(func):
+    """
+    :param func: функция без аргументов, возвращающая данные
+    :return: tuple (result, size): результат func и объём памяти процесса
+             в байтах, занятый при её вызове и не освобождённый после
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_memory():
+    """Сравнивает объём данных в виде списка записей и по столбцам."""
+    utils.zip_util.load_columns()  # кэш уже записан и не попадает в замер
+    _, records = traced_size(utils.zip_util.read_zip_all)
+    dataset, heap = traced_size(utils.zip_util.read_zip_dataset)
+    print(f'\nпамять: список записей {records / 1e6:.1f} МБ, ZipDataset {dataset.nbytes / 1e6:.1f} МБ '
+          f'(в куче {heap / 1e6:.1f} МБ, остальное — столбцы, отображённые из кэша)')
+
+
+if __name__ == '__main__':
+    main()
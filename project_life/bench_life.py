@@ -0,0 +1,401 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from life_from_class import (
+    Config,
+    ENGINES,
+    GifWriter,
+    StepWriter,
+    alive_mask,
+    count_neighbors,
+    create_engine,
+    frame_palette,
+    live_neighbors,
+    make_gif,
+    read_board,
+    read_input,
+    render_indices,
+    write_output,
+    write_png,
+)
+
+
+# Классические фигуры: X — живая клетка
+PATTERNS = {
+    'glider': [
+        '.X.',
+        '..X',
+        'XXX',
+    ],
+    'r-pentomino': [
+        '.XX',
+        'XX.',
+        '.X.',
+    ],
+    'gun': [  # планерное ружьё Госпера
+        '........................X...........',
+        '......................X.X...........',
+        '............XX......XX............XX',
+        '...........X...X....XX............XX',
+        'XX........X.....X...XX..............',
+        'XX........X...X.XX....X.X...........',
+        '..........X.....X.......X...........',
+        '...........X...X....................',
+        '............XX......................',
+    ],
+}
+BOARDS = ('random',) + tuple(PATTERNS)
+
+RESULTS_VERSION = 1
+
+
+def make_board(kind: str, size: int, seed: int = 42, density: float = 0.35) -> np.ndarray:
+    """
+    Строит воспроизводимое поле size x size.
+
+    'random' — случайное поле с заданной плотностью, иначе фигура из PATTERNS,
+    размноженная по полю с шагом в два своих размера, чтобы нагрузка росла
+    вместе с полем.
+
+    :param kind: str, вид поля ('random' или имя фигуры)
+    :param size: int, сторона поля
+    :param seed: int, зерно генератора случайных чисел
+    :param density: float, доля живых клеток случайного поля
+    :return: np.ndarray uint8 формы (size, size), 1 — живая клетка
+    :raises ValueError: если вид поля неизвестен
+    """
+    if kind == 'random':
+        rng = np.random.default_rng(seed)
+        return (rng.random((size, size)) < density).astype(np.uint8)
+
+    try:
+        rows = PATTERNS[kind]
+    except KeyError:
+        raise ValueError(f'Неизвестное поле "{kind}"')
+
+    pattern = np.array([[ch == 'X' for ch in row] for row in rows], dtype=np.uint8)
+    height, width = pattern.shape
+    board = np.zeros((size, size), dtype=np.uint8)
+    for top in range(1, size - height, 2 * height):
+        for left in range(1, size - width, 2 * width):
+            board[top:top + height, left:left + width] = pattern
+    return board
+
+
+def time_calls(calls: List[Callable[[], object]]) -> List[float]:
+    """
+    Замеряет время каждого вызова по отдельности.
+
+    :param calls: list, вызовы без аргументов
+    :return: list, время каждого вызова в секундах
+    """
+    timings = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def peak_memory(call: Callable[[], object]) -> int:
+    """
+    Пиковый прирост памяти Python и NumPy во время вызова (tracemalloc).
+
+    :param call: вызов без аргументов
+    :return: int, байт сверх памяти, занятой до вызова
+    """
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        call()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def stage_result(board: str, size: int, stage: str, timings: List[float],
+                 engine: Optional[str] = None, peak: Optional[int] = None, **extra) -> Dict:
+    """
+    Формирует запись результата одного этапа.
+
+    :param board: str, вид поля
+    :param size: int, сторона поля
+    :param stage: str, имя этапа
+    :param timings: list, время каждого вызова (обычно одно поколение) в секундах
+    :param engine: str, движок (для этапа step) или None
+    :param peak: int, пиковый прирост памяти в байтах или None
+    :return: dict, запись результата
+    """
+    return {
+        'board': board,
+        'size': size,
+        'stage': stage,
+        'engine': engine,
+        'calls': len(timings),
+        'seconds': {
+            'total': sum(timings),
+            'mean': statistics.fmean(timings),
+            'median': statistics.median(timings),
+            'min': min(timings),
+            'max': max(timings),
+        },
+        'peak_bytes': peak,
+        **extra,
+    }
+
+
+def bench_board(kind: str, size: int, args, tmp: str) -> List[Dict]:
+    """
+    Прогоняет все этапы для одного поля: чтение, подсчёт соседей,
+    шаг каждого движка (со сверкой с эталоном) и вывод.
+
+    :param kind: str, вид поля
+    :param size: int, сторона поля
+    :param args: argparse.Namespace, параметры запуска
+    :param tmp: str, каталог для временных файлов
+    :return: list, записи результатов
+    """
+    cells = make_board(kind, size, args.seed, args.density)
+    small = size <= args.reference_limit
+    memory = (lambda call: peak_memory(call)) if args.memory else (lambda call: None)
+    results = []
+
+    def record(stage, calls, engine=None, **extra):
+        timings = time_calls(calls)
+        results.append(stage_result(kind, size, stage, timings, engine, memory(calls[-1]), **extra))
+        print(f'  {kind:<12} {size:>5} {stage:<16} {engine or "":<10} '
+              f'{statistics.median(timings) * 1000:10.3f} мс')
+
+    # Чтение начального поля
+    seed_file = os.path.join(tmp, 'seed.txt')
+    with open(seed_file, 'wb') as f:
+        f.write(b'%d %d\n' % (size, size))
+        f.write(b'\n'.join(np.where(cells > 0, ord('X'), ord('.')).astype(np.uint8)))
+    record('read_board', [lambda: read_board(seed_file)] * args.repeat)
+    if small:
+        record('read_input', [lambda: read_input(seed_file)] * args.repeat)
+
+    # Подсчёт соседей
+    alive = cells > 0
+    record('count_neighbors', [lambda: count_neighbors(alive)] * args.repeat)
+    if small:
+        grid = cells.tolist()
+        sweep = lambda: [[live_neighbors(grid, r, c) for c in range(size)] for r in range(size)]
+        record('live_neighbors', [sweep] * args.repeat)
+
+    # Шаг движков со сверкой живых клеток с эталоном
+    reference_name = 'python' if small else 'numpy'
+    reference = create_engine(cells, Config(engine=reference_name))
+    for _ in range(args.generations):
+        reference.step()
+    expected = alive_mask(reference.snapshot())
+
+    config = Config(workers=args.workers)
+    for name in args.engines:
+        if name == 'python' and not small:
+            continue
+        config.engine = name
+        engine = create_engine(cells, config)
+        try:
+            timings = time_calls([engine.step] * args.generations)
+            valid = bool(np.array_equal(alive_mask(engine.snapshot()), expected))
+            results.append(stage_result(
+                kind, size, 'step', timings, name, memory(engine.step),
+                valid=valid, reference=reference_name
+            ))
+            print(f'  {kind:<12} {size:>5} {"step":<16} {name:<10} '
+                  f'{statistics.median(timings) * 1000:10.3f} мс'
+                  f'{"" if valid else "  РАСХОЖДЕНИЕ С ЭТАЛОНОМ"}')
+        finally:
+            engine.close()
+
+    # Вывод: текстовый файл, PNG, GIF
+    engine = create_engine(cells, Config(engine='numpy'))
+    boards = []
+    for _ in range(args.frames):
+        boards.append(engine.snapshot())
+        engine.step()
+
+    output = os.path.join(tmp, 'output.txt')
+    record('write_output', [lambda b=b, s=s: write_output(b, output, s) for s, b in enumerate(boards)])
+
+    writer = StepWriter(os.path.join(tmp, 'steps.txt'))
+    try:
+        record('step_writer', [lambda b=b, s=s: writer.write(b, s) for s, b in enumerate(boards)])
+    finally:
+        writer.close()
+
+    frame_config = Config(
+        cell_size=args.cell_size or max(1, 1024 // size),
+        gen_images_dir=os.path.join(tmp, f'png_{kind}_{size}'),
+        gif_name=os.path.join(tmp, 'life.gif'),
+    )
+    gif = GifWriter(os.path.join(tmp, 'frames.gif'), frame_palette(frame_config), frame_config.gif_duration)
+    try:
+        record('gif_frame', [lambda b=b: gif.append_indices(render_indices(b, frame_config))
+                             for b in boards])
+    finally:
+        gif.close()
+
+    record('write_png', [lambda b=b, s=s: write_png(b, s, frame_config) for s, b in enumerate(boards)])
+    record('make_gif', [lambda: make_gif(frame_config)], frames=len(boards))
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args) -> Dict:
+    """
+    Прогоняет все сочетания полей и размеров.
+
+    :param args: argparse.Namespace, параметры запуска
+    :return: dict, сведения о запуске (meta) и записи результатов (results)
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            for kind in args.boards:
+                results.extend(bench_board(kind, size, args, tmp))
+
+    return {
+        'version': RESULTS_VERSION,
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'parameters': {
+                key: value for key, value in vars(args).items()
+                if key not in ('output', 'compare', 'threshold')
+            },
+        },
+        'results': results,
+    }
+
+
+def result_key(result: Dict) -> tuple:
+    return result['board'], result['size'], result['stage'], result['engine']
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float) -> List[Dict]:
+    """
+    Сравнивает медианное время этапов двух запусков.
+
+    :param baseline: dict, результаты базового запуска
+    :param current: dict, результаты текущего запуска
+    :param threshold: float, отношение времени, выше которого этап считается регрессией
+    :return: list, строки сравнения (ключ, старое и новое время, отношение, регрессия)
+    """
+    old = {result_key(r): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        previous = old.get(result_key(result))
+        if previous is None:
+            continue
+        before = previous['seconds']['median']
+        after = result['seconds']['median']
+        ratio = after / before if before else float('inf')
+        rows.append({
+            'key': result_key(result),
+            'before': before,
+            'after': after,
+            'ratio': ratio,
+            'regression': ratio > threshold,
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict]) -> None:
+    print(f'{"поле":<12} {"размер":>6} {"этап":<16} {"движок":<10} '
+          f'{"было, мс":>10} {"стало, мс":>10} {"x":>6}')
+    for row in rows:
+        board, size, stage, engine = row['key']
+        mark = '  <- регрессия' if row['regression'] else ''
+        print(f'{board:<12} {size:>6} {stage:<16} {engine or "":<10} '
+              f'{row["before"] * 1000:10.3f} {row["after"] * 1000:10.3f} {row["ratio"]:6.2f}{mark}')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Замеры производительности игры Жизнь: движки, отрисовка и ввод-вывод'
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=[64, 256, 1024, 4096],
+                        help='Стороны полей (по умолчанию: 64 256 1024 4096)')
+    parser.add_argument('--boards', nargs='+', choices=BOARDS, default=list(BOARDS),
+                        help='Виды полей (по умолчанию: все)')
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES),
+                        default=['python', 'numpy', 'bitpacked'],
+                        help='Замеряемые движки (по умолчанию: python numpy bitpacked)')
+    parser.add_argument('--generations', type=int, default=10,
+                        help='Число замеряемых поколений каждого движка (по умолчанию: 10)')
+    parser.add_argument('--frames', type=int, default=5,
+                        help='Число поколений для замеров вывода (по умолчанию: 5)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Повторов для этапов без поколений (по умолчанию: 3)')
+    parser.add_argument('--reference-limit', type=int, default=256,
+                        help='Наибольшее поле для эталонной реализации (по умолчанию: 256)')
+    parser.add_argument('--cell-size', type=int, default=0,
+                        help='Размер клетки кадров в пикселях (по умолчанию: 1024 // сторона)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Число процессов движка parallel')
+    parser.add_argument('--seed', type=int, default=42, help='Зерно случайных полей')
+    parser.add_argument('--density', type=float, default=0.35, help='Плотность случайных полей')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='Не замерять пиковую память (tracemalloc)')
+    parser.add_argument('--output', default='bench_results.json',
+                        help='Файл результатов JSON (по умолчанию: bench_results.json)')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='Сравнить с результатами предыдущего запуска')
+    parser.add_argument('--threshold', type=float, default=1.1,
+                        help='Отношение времени, считающееся регрессией (по умолчанию: 1.1)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = run_benchmarks(args)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'Результаты записаны в {args.output}')
+
+    invalid = [r for r in report['results'] if r.get('valid') is False]
+    for r in invalid:
+        print(f'Движок {r["engine"]} расходится с эталоном {r["reference"]}: '
+              f'{r["board"]} {r["size"]}x{r["size"]}')
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            rows = compare_results(json.load(f), report, args.threshold)
+        print_comparison(rows)
+        regressions = [row for row in rows if row['regression']]
+
+    return 1 if invalid or regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,23 @@
 import os
-import argparse
-
-
-from PIL import Image, ImageDraw
+import bz2
+import csv
+import glob
+import gzip
+import json
+import lzma
+import mmap
+import queue
+import re
+import struct
+import threading
+import time
+import zipfile
+
+import numpy as np
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List
+from itertools import repeat
+from typing import Dict, List, Tuple
 
 
 @dataclass
@@ -29,71 +42,342 @@ class Config:
     gif_name: str = 'life.gif'
     gif_duration: int = 300  # мс между кадрами
 
+    engine: str = 'python'  # движок расчёта поколений, см. ENGINES
+    workers: int = os.cpu_count() or 1  # число процессов движка parallel
+    hashlife_cache_size: int = 1 << 20  # предельное число узлов в кэше HashLife
+    age_colors: bool = True  # раскрашивать клетки по возрасту (иначе возраст не хранится)
+    cycle_mode: str = 'off'  # реакция на повторение поля: 'off', 'stop' или 'skip'
+
+    save_png: bool = False  # сохранять ли отдельный PNG для каждого поколения
+    render: bool = True     # отрисовывать ли кадры (GIF и PNG); False — только файл поколений
+
+    output_format: str = 'text'  # формат файла поколений: 'text', 'rle' или 'delta'
+    compression: str = 'none'    # сжатие файла поколений: 'none', 'gzip', 'bz2' или 'xz'
+
+    rule: str = 'B3/S23'  # правило B/S: при скольких соседях клетка рождается (B) и выживает (S)
+
+    checkpoint_every: int = 0  # сохранять контрольную точку каждые N поколений; 0 — не сохранять
+    checkpoint_file: str = ''  # файл контрольной точки; пустая строка — output_file + '.ckpt'
+
+    metrics_file: str = ''  # файл метрик прогона (JSON); пустая строка — метрики выключены
+
+    pipeline: bool = False  # выводить поколения в отдельных потоках параллельно с расчётом
+    queue_size: int = 4     # сколько поколений может ждать вывода на каждом этапе конвейера
+
 
 Grid = List[List[int]]
 
+AGE_DTYPE = np.uint16
+MAX_AGE = int(np.iinfo(AGE_DTYPE).max)
+
+AGE_COLOR_STEP = 20  # на сколько светлеет цвет клетки за одно поколение
+AGE_COLOR_LIMIT = -(-255 // AGE_COLOR_STEP)  # возраст, начиная с которого цвет не меняется
+
+
+RLE_HEADER = re.compile(rb'\s*x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)\s*(?:,\s*rule\s*=\s*(\S*)\s*)?$')
+RLE_MAX_DIGITS = 15         # длиннее число повторений заведомо не помещается в поле
+RLE_CHUNK = 1 << 20         # байт тела RLE за один проход векторного декодера
+RLE_CARRY = b'0123456789 \t\r\n'  # символы, после которых нельзя разрезать тело RLE
+RLE_SPACE = np.zeros(256, dtype=bool)
+RLE_SPACE[list(b' \t\r\n')] = True
 
-def read_input(filename: str) -> Grid:
+# Таблица декодирования символов текстового формата: 1 — живая, 0 — мёртвая, 255 — ошибка
+TEXT_CELLS = np.full(256, 255, dtype=np.uint8)
+TEXT_CELLS[list(b'X1')] = 1
+TEXT_CELLS[list(b'.0 ')] = 0
+
+
+class SeedFile:
     """
-     Считывает начальное состояние игрового поля из файла.
+    Входной файл, отображённый в память (mmap).
 
-    :param filename: str, путь к входному файлу
-    :return: Grid, двумерный список (. — мёртвая, X — живая)
-    :raises FileNotFoundError: если файл не найден
+    Строки не копируются в список: read_lines() отдаёт их по одной вместе
+    с номером строки, а RLE декодируется векторно прямо из отображения.
+    """
+
+    def __init__(self, filename: str):
+        try:
+            self.file = open(filename, 'rb')
+        except FileNotFoundError:
+            raise FileNotFoundError(f'Файл "{filename}" не найден')
+        size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def read_lines(self, start: int = 0):
+        """
+        Перебирает строки файла начиная со смещения start.
+
+        :param start: int, смещение начала первой строки
+        :return: генератор (номер строки, смещение конца строки, bytes без перевода строки)
+        """
+        data = self.data
+        line_num = self.line_number(start)
+        while start < len(data):
+            stop = data.find(b'\n', start)
+            if stop < 0:
+                stop = len(data)
+            yield line_num, stop + 1, data[start:stop].rstrip(b'\r')
+            start, line_num = stop + 1, line_num + 1
+
+    def line_number(self, offset: int) -> int:
+        return self.data[:offset].count(b'\n') + 1
+
+    def rle_header(self):
+        """
+        Ищет заголовок RLE (x = .., y = ..) в первой значащей строке файла.
+
+        :return: (номер строки, смещение тела, x, y) или None для текстового формата
+        :raises ValueError: если заголовок RLE некорректен
+        """
+        for line_num, stop, line in self.read_lines():
+            if not line.strip() or line.lstrip().startswith(b'#'):
+                continue
+            if not line.lstrip().startswith(b'x'):
+                return None
+            match = RLE_HEADER.match(line)
+            if match is None:
+                raise ValueError(f'Некорректный заголовок RLE в строке {line_num}')
+            return line_num, stop, int(match.group(1)), int(match.group(2))
+        return None
+
+    def rle_chunks(self, start: int):
+        """
+        Перебирает тело RLE до завершающего '!' кусками по RLE_CHUNK байт.
+
+        Кусок всегда заканчивается символом серии, поэтому число повторений
+        не разрывается между кусками. Пробелы и переводы строк отбрасываются.
+
+        :param start: int, смещение тела RLE
+        :return: генератор (символы uint8, их смещения в файле)
+        """
+        data = self.data
+        stop = data.find(b'!', start)
+        if stop < 0:
+            stop = len(data)
+
+        while start < stop:
+            end = min(start + RLE_CHUNK, stop)
+            while end < stop and data[end - 1] in RLE_CARRY:
+                end += 1
+            chunk = np.frombuffer(data[start:end], dtype=np.uint8)
+            positions = np.flatnonzero(~RLE_SPACE[chunk])
+            yield chunk[positions], positions + start
+            start = end
+
+
+def _text_rows(seed: SeedFile, rectangular: bool):
+    """
+    Декодирует строки текстового формата (X/1 — живая, ./0/пробел — мёртвая).
+
+    Комментарии (#), пустые строки и строка размеров «ширина высота»
+    пропускаются; высота поля проверяется после последней строки.
+
+    :param seed: SeedFile, входной файл
+    :param rectangular: bool, требовать ли одинаковую длину строк без строки размеров
+    :return: генератор (номер строки, np.ndarray uint8 клеток строки)
     :raises ValueError: если файл пуст или содержит некорректные данные
     """
-    grid: Grid = []
+    width = height = 0
     expected_width = None
     expected_height = None
 
-    try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            for line_num, line in enumerate(file, start=1):
-                line = line.rstrip('\n')
-
-                if not line.strip() or line.lstrip().startswith('#'):
-                    continue
-
-                tokens = line.split()
-                if expected_width is None and len(tokens) == 2 and all(t.isdigit() for t in tokens):
-                    expected_width, expected_height = map(int, tokens)
-                    continue
-
-                # Преобразуем строку поля в список клеток
-                row = []
-                for ch in line:
-                    if ch in ('X', '1'):
-                        row.append(1)
-                    elif ch in ('.', '0', ' '):
-                        row.append(0)
-                    else:
-                        raise ValueError(
-                            f'Недопустимый символ "{ch}" в строке {line_num}'
-                        )
-
-                # Проверяем ширину строки
-                if expected_width is not None and len(row) != expected_width:
-                    raise ValueError(
-                        f'Неверная длина строки {line_num}: '
-                        f'ожидалось {expected_width}, получено {len(row)}'
-                    )
-
-                grid.append(row)
-
-        if not grid:
-            raise ValueError('Входной файл не содержит данных игрового поля')
-
-        # Проверяем высоту поля
-        if expected_height is not None and len(grid) != expected_height:
+    for line_num, _, line in seed.read_lines():
+        if not line.strip() or line.lstrip().startswith(b'#'):
+            continue
+
+        tokens = line.split(None, 2)
+        if expected_width is None and len(tokens) == 2 and all(t.isdigit() for t in tokens):
+            expected_width, expected_height = map(int, tokens)
+            continue
+
+        row = TEXT_CELLS[np.frombuffer(line, dtype=np.uint8)]
+        if row.size and row.max() == 255:
+            text = line.decode('utf-8', errors='replace')
+            ch = next(ch for ch in text if ch not in 'X1.0 ')
+            raise ValueError(f'Недопустимый символ "{ch}" в строке {line_num}')
+
+        # Проверяем ширину строки
+        if expected_width is not None and row.size != expected_width:
+            raise ValueError(
+                f'Неверная длина строки {line_num}: '
+                f'ожидалось {expected_width}, получено {row.size}'
+            )
+        if rectangular and height and row.size != width:
+            raise ValueError(
+                f'Неверная длина строки {line_num}: '
+                f'ожидалось {width}, получено {row.size}'
+            )
+
+        yield line_num, row
+        width, height = row.size, height + 1
+
+    if not height:
+        raise ValueError('Входной файл не содержит данных игрового поля')
+
+    # Проверяем высоту поля
+    if expected_height is not None and height != expected_height:
+        raise ValueError(
+            f'Неверное количество строк поля: '
+            f'ожидалось {expected_height}, получено {height}'
+        )
+
+
+def _decode_rle(seed: SeedFile, header) -> np.ndarray:
+    """
+    Векторно декодирует тело RLE (b — мёртвые, o — живые, $ — конец строки).
+
+    Тело обрабатывается кусками, между которыми переносятся только текущие
+    строка и столбец, поэтому временные массивы не зависят от размера файла.
+
+    :param seed: SeedFile, входной файл
+    :param header: tuple, результат SeedFile.rle_header()
+    :return: np.ndarray uint8 формы (y, x), 1 — живая клетка
+    :raises ValueError: если тело RLE некорректно или не помещается в поле
+    """
+    _, body_start, width, height = header
+    if not width or not height:
+        raise ValueError('Входной файл не содержит данных игрового поля')
+
+    cells = np.zeros((height, width), dtype=np.uint8)
+    flat = cells.reshape(-1)
+    row = col = 0
+
+    for chars, positions in seed.rle_chunks(body_start):
+        is_digit = (chars >= ord('0')) & (chars <= ord('9'))
+        tags = np.flatnonzero(~is_digit)
+        tag_chars = chars[tags]
+
+        invalid = np.flatnonzero(~np.isin(tag_chars, list(b'bo$')))
+        if invalid.size:
+            bad = tags[invalid[0]]
+            raise ValueError(
+                f'Недопустимый символ "{chr(chars[bad])}" '
+                f'в строке {seed.line_number(positions[bad])}'
+            )
+
+        # Число повторений: цифры перед символом складываются по разрядам
+        digits = np.flatnonzero(is_digit)
+        owner = np.cumsum(~is_digit)[digits]  # номер символа, к которому относится цифра
+        digits, owner = digits[owner < tags.size], owner[owner < tags.size]
+        power = tags[owner] - digits - 1
+        if power.size and power.max() >= RLE_MAX_DIGITS:
+            bad = tags[owner[np.argmax(power)]]
+            raise ValueError(f'Слишком большое число повторений в строке {seed.line_number(positions[bad])}')
+        values = (chars[digits] - ord('0')).astype(np.int64) * 10 ** power
+        counts = np.ones(tags.size, dtype=np.int64)
+        if owner.size:
+            first = np.flatnonzero(np.diff(owner, prepend=-1))
+            counts[owner[first]] = np.add.reduceat(values, first)
+
+        # Строка и столбец начала каждой серии
+        newline = tag_chars == ord('$')
+        lengths = np.where(newline, 0, counts)
+        skipped = counts - lengths
+        rows = row + np.cumsum(skipped) - skipped
+        before = col + np.cumsum(lengths) - lengths
+        cols = before - np.maximum.accumulate(np.where(newline, before, 0))
+        if tags.size:
+            row, col = rows[-1] + skipped[-1], cols[-1] + lengths[-1]
+
+        runs = np.flatnonzero(~newline)
+        if not runs.size:
+            continue
+        overflow = np.flatnonzero(cols[runs] + lengths[runs] > width)
+        if overflow.size:
+            bad = runs[overflow[0]]
+            same_row = runs[rows[runs] == rows[bad]]
+            raise ValueError(
+                f'Неверная длина строки {seed.line_number(positions[tags[bad]])}: '
+                f'ожидалось {width}, получено {(cols[same_row] + lengths[same_row]).max()}'
+            )
+        used = int(rows[runs].max()) + 1
+        if used > height:
             raise ValueError(
                 f'Неверное количество строк поля: '
-                f'ожидалось {expected_height}, получено {len(grid)}'
+                f'ожидалось {height}, получено {used}'
             )
 
-        return grid
+        # Живые серии отмечаются разностным массивом на охваченном куске поля
+        alive = runs[(tag_chars[runs] == ord('o')) & (lengths[runs] > 0)]
+        if alive.size:
+            starts = rows[alive] * width + cols[alive]
+            ends = starts + lengths[alive]
+            low, high = starts.min(), ends.max()
+            diff = np.zeros(high - low + 1, dtype=np.int8)
+            diff[starts - low] += 1
+            diff[ends - low] -= 1
+            flat[low:high] |= np.cumsum(diff[:-1], dtype=np.int8).view(np.uint8)
+
+    return cells
+
+
+def _pack_board(cells: np.ndarray) -> 'BitBoard':
+    words = [pack_rows(cells[start:start + PACKED_BAND_ROWS] > 0)
+             for start in range(0, cells.shape[0], PACKED_BAND_ROWS)]
+    return BitBoard(np.concatenate(words), cells.shape[1])
+
+
+def read_board(filename: str, packed: bool = False):
+    """
+    Считывает начальное состояние поля в компактный массив.
+
+    Файл отображается в память и декодируется построчно таблицей символов;
+    кроме текстового формата поддерживается стандартный RLE
+    (заголовок «x = .., y = .., rule = ..», символы b, o, $, !).
+
+    :param filename: str, путь к входному файлу
+    :param packed: bool, упаковывать ли строки по мере чтения в BitBoard
+    :return: np.ndarray uint8 формы (rows, cols), 1 — живая клетка,
+             или BitBoard, если packed=True
+    :raises FileNotFoundError: если файл не найден
+    :raises ValueError: если файл пуст или содержит некорректные данные
+    """
+    with SeedFile(filename) as seed:
+        header = seed.rle_header()
+        if header is not None:
+            cells = _decode_rle(seed, header)
+            return _pack_board(cells) if packed else cells
+
+        band, bands = [], []
+        for _, row in _text_rows(seed, rectangular=True):
+            band.append(row)
+            if packed and len(band) == PACKED_BAND_ROWS:
+                bands.append(pack_rows(np.stack(band) > 0))
+                band = []
+        if packed:
+            if band:
+                bands.append(pack_rows(np.stack(band) > 0))
+            return BitBoard(np.concatenate(bands), len(row))
+        return np.stack(band)
+
+
+def read_input(filename: str, packed: bool = False):
+    """
+     Считывает начальное состояние игрового поля из файла.
+
+    :param filename: str, путь к входному файлу
+    :param packed: bool, упаковывать ли строки по мере чтения в BitBoard
+    :return: Grid, двумерный список (. — мёртвая, X — живая),
+             или BitBoard, если packed=True
+    :raises FileNotFoundError: если файл не найден
+    :raises ValueError: если файл пуст или содержит некорректные данные
+    """
+    if packed:
+        return read_board(filename, packed=True)
 
-    except FileNotFoundError:
-        raise FileNotFoundError(f'Файл "{filename}" не найден')
+    with SeedFile(filename) as seed:
+        header = seed.rle_header()
+        if header is not None:
+            return _decode_rle(seed, header).tolist()
+        return [row.tolist() for _, row in _text_rows(seed, rectangular=False)]
 
 
 
@@ -108,14 +392,341 @@ def write_output(grid: Grid, filename: str, step: int) -> None:
     :raises: OSError: если произошла ошибка при записи файла
     """
     try:
-        with open(filename, 'a', encoding='utf-8') as f:
-            f.write(f'--- Step {step} ---\n')
-            for row in grid:
-                f.write(';'.join(map(str, row)) + '\n')
+        with open(filename, 'ab') as f:
+            f.write(format_text_step(grid, step))
     except OSError as e:
         raise OSError(f'Ошибка записи в файл "{filename}": {e}')
 
 
+def format_text_step(board, step: int) -> bytes:
+    """
+    Форматирует поколение в текстовом формате '--- Step N ---'
+    (возраст клеток через ';', строка поля на строку файла).
+
+    :param board: поле любого движка
+    :param step: int, номер поколения
+    :return: bytes, текст поколения в UTF-8
+    """
+    ages = exact_ages(board)
+    header = f'--- Step {step} ---\n'.encode()
+
+    if ages.size and ages.max() < 10:
+        # Все возрасты однозначные: собираем текст прямо из байтов цифр
+        rows, cols = ages.shape
+        text = np.full((rows, 2 * cols), ord(';'), dtype=np.uint8)
+        text[:, 0::2] = ages + ord('0')
+        text[:, -1] = ord('\n')
+        return header + text.tobytes()
+
+    lines = (';'.join(map(str, row)) + '\n' for row in ages.tolist())
+    return header + ''.join(lines).encode()
+
+
+RLE_LINE_WIDTH = 70
+
+
+def _rle_run(count: int, tag: str) -> str:
+    return f'{count}{tag}' if count > 1 else tag
+
+
+def format_rle_step(board, step: int, rule: str = 'B3/S23') -> bytes:
+    """
+    Форматирует поколение в стандартном формате RLE игры «Жизнь»
+    с комментарием '#C Step N'. Возраст клеток не сохраняется.
+
+    :param board: поле любого движка
+    :param step: int, номер поколения
+    :param rule: str, правило для заголовка RLE
+    :return: bytes, текст поколения
+    """
+    alive = alive_mask(board)
+    rows, cols = alive.shape
+
+    tokens = []
+    pending_rows = 0
+    for row in alive:
+        bounds = np.flatnonzero(np.diff(np.concatenate(([0], row.view(np.int8), [0]))))
+        if bounds.size:
+            if pending_rows:
+                tokens.append(_rle_run(pending_rows, '$'))
+            position = 0
+            for start, stop in zip(bounds[::2].tolist(), bounds[1::2].tolist()):
+                if start > position:
+                    tokens.append(_rle_run(start - position, 'b'))
+                tokens.append(_rle_run(stop - start, 'o'))
+                position = stop
+            pending_rows = 0
+        pending_rows += 1
+    tokens.append('!')
+
+    lines, line = [], ''
+    for token in tokens:
+        if len(line) + len(token) > RLE_LINE_WIDTH:
+            lines.append(line)
+            line = ''
+        line += token
+    lines.append(line)
+
+    header = f'#C Step {step}\nx = {cols}, y = {rows}, rule = {rule}\n'
+    return (header + '\n'.join(lines) + '\n').encode()
+
+
+DELTA_MAGIC = b'LIFD'
+DELTA_VERSION = 1
+DELTA_HEADER = struct.Struct('<4sBII')  # сигнатура, версия, строки, столбцы
+DELTA_RECORD = struct.Struct('<IBI')     # номер поколения, тип записи, число значений
+DELTA_FULL, DELTA_CHANGES = 0, 1
+
+COMPRESSORS = {
+    'none': lambda raw: raw,
+    'gzip': lambda raw: gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6),
+    'bz2': lambda raw: bz2.BZ2File(raw, mode='wb'),
+    'xz': lambda raw: lzma.LZMAFile(raw, mode='wb'),
+}
+
+
+class StepWriter:
+    """
+    Запись поколений в один файл, открытый на весь прогон.
+
+    Форматы:
+    - 'text' — '--- Step N ---' и строки возрастов через ';' (как write_output);
+    - 'rle' — стандартный RLE для каждого поколения, без возраста;
+    - 'delta' — двоичный: первое поколение целиком (возраст uint16), далее
+      только номера клеток, которые родились или погибли. Возраст остальных
+      восстанавливается по правилу «выжившие стареют на 1»; если поколения
+      идут не подряд или возраст не следует этому правилу, поколение
+      записывается целиком.
+
+    Поверх любого формата можно включить сжатие из стандартной библиотеки
+    (gzip, bz2, xz). Запись идёт через буфер buffer_size байт.
+
+    Если задано offset, файл не пересоздаётся: всё после offset отбрасывается,
+    и запись продолжается с этого места (продолжение с контрольной точки).
+    """
+
+    def __init__(self, filename: str, fmt: str = 'text', compression: str = 'none',
+                 rule: str = 'B3/S23', buffer_size: int = 1 << 20, offset: int = None):
+        if fmt not in ('text', 'rle', 'delta'):
+            raise ValueError(f'Неизвестный формат вывода "{fmt}"')
+        if compression not in COMPRESSORS:
+            raise ValueError(f'Неизвестный тип сжатия "{compression}"')
+
+        self.filename = filename
+        self.fmt = fmt
+        self.compression = compression
+        self.rule = rule
+        self.previous = None
+        self.previous_step = None
+        try:
+            if offset is None:
+                self.raw = open(filename, 'wb', buffering=buffer_size)
+            else:
+                self.raw = open(filename, 'r+b', buffering=buffer_size)
+                self.raw.seek(offset)
+                self.raw.truncate()
+            self.stream = COMPRESSORS[compression](self.raw)
+        except OSError as e:
+            raise OSError(f'Ошибка записи в файл "{filename}": {e}')
+
+    def restore(self, board, step: int) -> None:
+        """
+        Запоминает последнее записанное поколение при продолжении прогона,
+        чтобы формат 'delta' продолжил цепочку изменений без нового заголовка.
+
+        :param board: поле, записанное последним
+        :param step: int, его номер
+        """
+        self.previous = grid_to_array(as_array(board))
+        self.previous_step = step
+
+    def checkpoint(self) -> int:
+        """
+        Сбрасывает записанное на диск и возвращает длину файла.
+
+        Поток сжатия при этом завершается и начинается заново: файл до
+        возвращённого смещения остаётся целым архивом из нескольких частей,
+        которые gzip, bz2 и xz читают подряд.
+
+        :return: int, смещение, с которого можно продолжить запись
+        :raises OSError: если произошла ошибка при записи файла
+        """
+        try:
+            if self.stream is not self.raw:
+                self.stream.close()
+            self.raw.flush()
+            offset = self.raw.tell()
+            if self.stream is not self.raw:
+                self.stream = COMPRESSORS[self.compression](self.raw)  # заголовок части — уже после offset
+            return offset
+        except OSError as e:
+            raise OSError(f'Ошибка записи в файл "{self.filename}": {e}')
+
+    def write(self, board, step: int) -> int:
+        """
+        Записывает поколение.
+
+        :param board: поле любого движка
+        :param step: int, номер поколения
+        :return: int, число записанных байт (до сжатия)
+        :raises OSError: если произошла ошибка при записи файла
+        """
+        if self.fmt == 'text':
+            data = format_text_step(board, step)
+        elif self.fmt == 'rle':
+            data = format_rle_step(board, step, self.rule)
+        else:
+            data = self._delta_record(as_array(board), step)
+
+        try:
+            self.stream.write(data)
+        except OSError as e:
+            raise OSError(f'Ошибка записи в файл "{self.filename}": {e}')
+        return len(data)
+
+    def _delta_record(self, ages: np.ndarray, step: int) -> bytes:
+        previous, self.previous = self.previous, grid_to_array(ages)
+        consecutive, self.previous_step = self.previous_step == step - 1, step
+
+        if previous is None:
+            rows, cols = ages.shape
+            header = DELTA_HEADER.pack(DELTA_MAGIC, DELTA_VERSION, rows, cols)
+            return header + self._full_record(self.previous, step)
+
+        if consecutive:
+            expected = _age_after_step(previous, self.previous > 0)
+            if np.array_equal(expected, self.previous):
+                changed = np.flatnonzero((previous > 0) != (self.previous > 0)).astype('<u4')
+                return DELTA_RECORD.pack(step, DELTA_CHANGES, changed.size) + changed.tobytes()
+        return self._full_record(self.previous, step)
+
+    @staticmethod
+    def _full_record(ages: np.ndarray, step: int) -> bytes:
+        return DELTA_RECORD.pack(step, DELTA_FULL, ages.size) + ages.astype('<u2').tobytes()
+
+    def close(self) -> None:
+        try:
+            if self.stream is not self.raw:
+                self.stream.close()
+        finally:
+            self.raw.close()
+
+
+def _age_after_step(ages: np.ndarray, alive: np.ndarray) -> np.ndarray:
+    """
+    Возраст клеток после шага с известной маской живых клеток:
+    выжившие стареют на 1, родившиеся получают возраст 1, погибшие — 0.
+    """
+    older = ages + (ages < MAX_AGE).astype(AGE_DTYPE)
+    return np.where(alive, np.where(ages > 0, older, 1), 0).astype(AGE_DTYPE)
+
+
+def open_step_log(filename: str):
+    """
+    Открывает файл поколений для чтения, определяя сжатие по сигнатуре.
+
+    :param filename: str, путь к файлу
+    :return: двоичный файловый объект
+    """
+    with open(filename, 'rb') as f:
+        magic = f.read(6)
+    if magic.startswith(b'\x1f\x8b'):
+        return gzip.open(filename, 'rb')
+    if magic.startswith(b'BZh'):
+        return bz2.open(filename, 'rb')
+    if magic.startswith(b'\xfd7zXZ\x00'):
+        return lzma.open(filename, 'rb')
+    return open(filename, 'rb')
+
+
+def read_delta_steps(filename: str):
+    """
+    Последовательно восстанавливает поколения из двоичного формата 'delta'.
+
+    :param filename: str, путь к файлу (возможно, сжатому)
+    :return: итератор пар (номер поколения, np.ndarray возрастов)
+    :raises ValueError: если файл не является файлом формата 'delta'
+    """
+    with open_step_log(filename) as f:
+        magic, version, rows, cols = DELTA_HEADER.unpack(f.read(DELTA_HEADER.size))
+        if magic != DELTA_MAGIC or version != DELTA_VERSION:
+            raise ValueError(f'Файл "{filename}" не является файлом поколений формата delta')
+
+        ages = None
+        while True:
+            record = f.read(DELTA_RECORD.size)
+            if not record:
+                return
+            step, kind, count = DELTA_RECORD.unpack(record)
+            if kind == DELTA_FULL:
+                data = np.frombuffer(f.read(2 * count), dtype='<u2')
+                ages = data.reshape(rows, cols).astype(AGE_DTYPE)
+            else:
+                changed = np.frombuffer(f.read(4 * count), dtype='<u4')
+                alive = ages > 0
+                alive.flat[changed] = ~alive.flat[changed]
+                ages = _age_after_step(ages, alive)
+            yield step, ages
+
+
+RULE_FORMS = (
+    (re.compile(r'B([0-8]*)/S([0-8]*)'), False),
+    (re.compile(r'S([0-8]*)/B([0-8]*)'), True),
+    (re.compile(r'([0-8]*)/([0-8]*)'), True),  # старая запись «выживание/рождение»: 23/3
+)
+
+
+def parse_rule(rule: str) -> np.ndarray:
+    """
+    Компилирует правило вида B3/S23 в таблицу переходов.
+
+    Поддерживаются записи B36/S23, S23/B36 и 23/36 (выживание/рождение);
+    регистр букв не важен. Примеры: B3/S23 — «Жизнь», B36/S23 — HighLife,
+    B2/S — Seeds.
+
+    :param rule: str, правило
+    :return: np.ndarray, булева таблица формы (2, 9): table[живая][число соседей] —
+             будет ли клетка живой в следующем поколении
+    :raises ValueError: если правило записано некорректно
+    """
+    text = rule.strip().upper()
+    for pattern, survive_first in RULE_FORMS:
+        match = pattern.fullmatch(text)
+        if match:
+            born, survive = match.groups()
+            if survive_first:
+                born, survive = survive, born
+            table = np.zeros((2, 9), dtype=bool)
+            table[0, [int(n) for n in born]] = True
+            table[1, [int(n) for n in survive]] = True
+            return table
+    raise ValueError(f'Некорректное правило "{rule}": ожидается запись вида B3/S23')
+
+
+def format_rule(table: np.ndarray) -> str:
+    """
+    :param table: np.ndarray, таблица переходов parse_rule
+    :return: str, правило в записи B3/S23
+    """
+    born = ''.join(str(n) for n in np.flatnonzero(table[0]))
+    survive = ''.join(str(n) for n in np.flatnonzero(table[1]))
+    return f'B{born}/S{survive}'
+
+
+LIFE_RULE = parse_rule('B3/S23')
+
+
+def check_births_from_zero(table: np.ndarray, engine: str) -> None:
+    """
+    Движки, которые перебирают только окрестности живых клеток,
+    не могут рождать клетки без соседей (правила с B0).
+
+    :raises ValueError: если правило содержит B0
+    """
+    if table[0, 0]:
+        raise ValueError(f'Движок "{engine}" не поддерживает правила с B0')
+
+
 def live_neighbors(grid: Grid, row: int, col: int) -> int:
     """
     Подсчитывает количество живых соседей у клетки.
@@ -140,16 +751,18 @@ def live_neighbors(grid: Grid, row: int, col: int) -> int:
     return count
 
 
-def next_generation(grid: Grid) -> Grid:
+def next_generation(grid: Grid, rule: np.ndarray = LIFE_RULE) -> Grid:
     """
     Вычисляет следующее поколение игрового поля
     по правилам игры «Жизнь».
 
     :param grid: Grid, текущее состояние поля
+    :param rule: np.ndarray, таблица переходов parse_rule (по умолчанию B3/S23)
     :return: Grid, новое поколение поля
     """
     rows, cols = len(grid), len(grid[0])
     new_grid = [[0] * cols for _ in range(rows)]
+    born, survive = rule.tolist()
 
     for r in range(rows):
         for c in range(cols):
@@ -157,153 +770,2202 @@ def next_generation(grid: Grid) -> Grid:
             age = grid[r][c]
 
             if age > 0:
-                new_grid[r][c] = age + 1 if neighbors in (2, 3) else 0
+                new_grid[r][c] = age + 1 if survive[neighbors] else 0
             else:
-                if neighbors == 3:
+                if born[neighbors]:
                     new_grid[r][c] = 1
 
     return new_grid
 
 
-def age_color(age: int, base_color: tuple) -> tuple:
+def grid_to_array(grid: Grid) -> np.ndarray:
     """
-    Вычисляет цвет клетки в зависимости от её возраста.
+    Преобразует поле-список в массив возрастов NumPy.
 
-    Чем больше возраст клетки, тем светлее её цвет.
+    Возраст, превышающий MAX_AGE, ограничивается сверху.
 
-    :param age: int, возраст клетки
-    :param base_color: tuple, базовый RGB-цвет
-    :return: tuple, RGB-цвет клетки
+    :param grid: Grid, игровое поле
+    :return: np.ndarray, массив возрастов формы (rows, cols) типа AGE_DTYPE
     """
-    factor = min(age * 20, 255)
-    return tuple(min(c + factor, 255) for c in base_color)
+    if isinstance(grid, np.ndarray) and grid.dtype.itemsize <= 2 and grid.dtype.kind in 'bu':
+        return grid.astype(AGE_DTYPE)
+    ages = np.array(grid, dtype=np.int64)
+    return np.minimum(ages, MAX_AGE).astype(AGE_DTYPE)
 
 
-def write_png(grid: Grid, step: int, config: Config) -> None:
+def as_grid(board) -> Grid:
     """
-    Создаёт PNG-изображение текущего поколения игрового поля.
+    Приводит поле любого движка к виду Grid (список списков int).
 
-    :param grid: Grid, текущее состояние поля
-    :param step: int, номер поколения
-    :param config: Config, параметры конфигурации
-    :return: None
+    :param board: Grid, np.ndarray или BitBoard, игровое поле
+    :return: Grid, игровое поле
     """
-    os.makedirs(config.gen_images_dir, exist_ok=True)
+    if isinstance(board, BitBoard):
+        board = board.to_array()
+    if isinstance(board, np.ndarray):
+        return board.tolist()
+    return board
 
-    rows, cols = len(grid), len(grid[0])
-    width = cols * config.cell_size
-    height = rows * config.cell_size
 
-    img = Image.new('RGB', (width, height), config.background_color)
-    draw = ImageDraw.Draw(img)
+def as_array(board) -> np.ndarray:
+    """
+    Приводит поле любого движка к массиву возрастов.
 
-    for r in range(rows):
-        for c in range(cols):
-            x1 = c * config.cell_size
-            y1 = r * config.cell_size
-            x2 = x1 + config.cell_size
-            y2 = y1 + config.cell_size
-
-            if grid[r][c] > 0:
-                draw.rectangle(
-                    [x1, y1, x2, y2],
-                    fill=age_color(grid[r][c], config.base_color)
-                )
+    :param board: Grid, np.ndarray или BitBoard, игровое поле
+    :return: np.ndarray, массив возрастов типа AGE_DTYPE
+    """
+    if isinstance(board, BitBoard):
+        return board.to_array()
+    if isinstance(board, np.ndarray):
+        return board
+    return grid_to_array(board)
 
-            draw.rectangle(
-                [x1, y1, x2, y2],
-                outline=config.border_color
-            )
 
-    filename = os.path.join(
-        config.gen_images_dir,
-        f'generation_{step:03}.png'
-    )
-    img.save(filename)
+def exact_ages(board) -> np.ndarray:
+    """
+    Приводит поле любого движка к массиву возрастов без ограничения сверху.
 
+    У движка python возраст не ограничен, поэтому поле-список переводится
+    в int64; поля остальных движков — массивы AGE_DTYPE (см. as_array).
 
-def make_gif(config: Config) -> None:
+    :param board: Grid, np.ndarray или BitBoard, игровое поле
+    :return: np.ndarray, массив возрастов формы (rows, cols)
     """
-    Создаёт GIF-анимацию из сгенерированных PNG-изображений.
+    if isinstance(board, list):
+        return np.array(board, dtype=np.int64).reshape(len(board), -1)
+    return as_array(board)
 
-    :param config: Config, параметры конфигурации
-    :return: None
-    :raises RuntimeError: если не удалось создать GIF
-    :raises FileNotFoundError: не удалось найти файлы PNG
+
+def count_neighbors(alive: np.ndarray) -> np.ndarray:
     """
-    try:
-        gen_image = sorted(
-            os.path.join(config.gen_images_dir, f)
-            for f in os.listdir(config.gen_images_dir)
-            if f.endswith('.png')
-        )
+    Подсчитывает число живых соседей для всех клеток сразу.
 
-        if not gen_image:
-            raise FileNotFoundError('Нет PNG файлов для создания GIF')
+    Поле дополняется рамкой из мёртвых клеток, после чего
+    восемь сдвинутых копий складываются поэлементно.
 
-        images = [Image.open(frame) for frame in gen_image]
+    :param alive: np.ndarray, булев массив живых клеток
+    :return: np.ndarray, массив uint8 с количеством соседей
+    """
+    padded = np.pad(alive.astype(np.uint8), 1)
+    rows, cols = alive.shape
+    counts = np.zeros((rows, cols), dtype=np.uint8)
 
-        images[0].save(
-            config.gif_name,
-            save_all=True,
-            append_images=images[1:],
-            duration=config.gif_duration,
-            loop=0
-        )
+    for dy in (0, 1, 2):
+        for dx in (0, 1, 2):
+            if dy == 1 and dx == 1:
+                continue
+            counts += padded[dy:dy + rows, dx:dx + cols]
+    return counts
 
-    except Exception as e:
-        raise RuntimeError(f'Ошибка создания GIF: {e}')
 
+def count_in(neighbors: np.ndarray, allowed: np.ndarray) -> np.ndarray:
+    """
+    Маска клеток, число соседей которых отмечено в строке таблицы переходов.
 
-def parse_args():
-    parser = argparse.ArgumentParser(
-        description='Игра Жизнь: генерация PNG и GIF'
-    )
+    Отмеченные числа собираются в непрерывные отрезки lo..hi, и каждый
+    отрезок проверяется одним беззнаковым сравнением (n - lo) <= hi - lo:
+    так выходит быстрее, чем выборка из таблицы по индексу.
 
-    parser.add_argument(
-        'input_file',
-        help='Файл с начальным состоянием поля'
-    )
+    :param neighbors: np.ndarray, массив uint8 с количеством соседей
+    :param allowed: np.ndarray, булева строка таблицы parse_rule из 9 элементов
+    :return: np.ndarray, булева маска
+    """
+    mask = None
+    counts = np.flatnonzero(allowed).tolist()
+    while counts:
+        lo = hi = counts.pop(0)
+        while counts and counts[0] == hi + 1:
+            hi = counts.pop(0)
+        term = neighbors == lo if lo == hi else neighbors - np.uint8(lo) <= hi - lo
+        mask = term if mask is None else mask | term
+    return mask if mask is not None else np.zeros(neighbors.shape, dtype=bool)
+
+
+def next_generation_numpy(ages: np.ndarray, rule: np.ndarray = LIFE_RULE) -> np.ndarray:
+    """
+    Векторизованный аналог next_generation для массива возрастов.
 
-    parser.add_argument(
-        'output_file',
-        help='CSV файл для записи поколений'
-    )
+    Правила и нумерация возрастов совпадают с next_generation;
+    возраст выживших клеток насыщается на значении MAX_AGE.
 
-    parser.add_argument(
-        'steps',
-        type=int,
-        help='Количество поколений'
-    )
+    :param ages: np.ndarray, массив возрастов (0 — мёртвая клетка)
+    :param rule: np.ndarray, таблица переходов parse_rule (по умолчанию B3/S23)
+    :return: np.ndarray, массив возрастов следующего поколения
+    """
+    alive = ages > 0
+    neighbors = count_neighbors(alive)
 
-    return parser.parse_args()
+    survive = alive & count_in(neighbors, rule[1])
+    born = ~alive & count_in(neighbors, rule[0])
 
+    older = ages + (ages < MAX_AGE).astype(ages.dtype)
+    return np.where(survive, older, born.astype(ages.dtype))
 
-def main():
+
+Cells = Dict[Tuple[int, int], int]
+
+NEIGHBOR_OFFSETS = tuple(
+    (dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx
+)
+
+
+def grid_to_cells(grid: Grid) -> Cells:
     """
-    Запуск программы
+    Преобразует поле в словарь живых клеток.
 
-    :return: None
+    :param grid: Grid, игровое поле
+    :return: Cells, словарь (строка, столбец) -> возраст живой клетки
     """
-    try:
-        args = parse_args()
+    if isinstance(grid, np.ndarray):
+        rows, cols = np.nonzero(grid)
+        return dict(zip(zip(rows.tolist(), cols.tolist()), grid[rows, cols].tolist()))
+    return {
+        (r, c): age
+        for r, row in enumerate(grid)
+        for c, age in enumerate(row)
+        if age > 0
+    }
+
+
+def cells_to_array(cells: Cells, rows: int, cols: int) -> np.ndarray:
+    """
+    Разворачивает словарь живых клеток в массив возрастов.
 
-        config = Config(
-            input_file=args.input_file,
-            output_file=args.output_file,
-            generations=args.steps
-        )
+    :param cells: Cells, словарь живых клеток
+    :param rows: int, количество строк поля
+    :param cols: int, количество столбцов поля
+    :return: np.ndarray, массив возрастов типа AGE_DTYPE
+    """
+    ages = np.zeros((rows, cols), dtype=AGE_DTYPE)
+    if cells:
+        r, c = zip(*cells)
+        ages[r, c] = np.minimum(list(cells.values()), MAX_AGE)
+    return ages
 
-        grid = read_input(config.input_file)
-        open(config.output_file, 'w').close()
 
-        for step in range(config.generations + 1):
-            write_output(grid, config.output_file, step)
-            write_png(grid, step, config)
-            grid = next_generation(grid)
+def next_generation_sparse(cells: Cells, rows: int, cols: int,
+                           rule: np.ndarray = LIFE_RULE) -> Cells:
+    """
+    Вычисляет следующее поколение, перебирая только живые клетки
+    и их соседей. Время шага пропорционально населению, а не площади поля.
+    Правила с B0 не поддерживаются: клетки без живых соседей не перебираются.
+
+    :param cells: Cells, словарь живых клеток
+    :param rows: int, количество строк поля
+    :param cols: int, количество столбцов поля
+    :param rule: np.ndarray, таблица переходов parse_rule (по умолчанию B3/S23)
+    :return: Cells, словарь живых клеток следующего поколения
+    """
+    born, survive = rule.tolist()
+    counts: Dict[Tuple[int, int], int] = {}
+    for r, c in cells:
+        for dy, dx in NEIGHBOR_OFFSETS:
+            ny, nx = r + dy, c + dx
+            if 0 <= ny < rows and 0 <= nx < cols:
+                counts[ny, nx] = counts.get((ny, nx), 0) + 1
+
+    new_cells: Cells = {}
+    for pos, neighbors in counts.items():
+        age = cells.get(pos, 0)
+        if age > 0:
+            if survive[neighbors]:
+                new_cells[pos] = age + 1
+        elif born[neighbors]:
+            new_cells[pos] = 1
+
+    if survive[0]:
+        # Одинокие живые клетки не попали в counts
+        for pos, age in cells.items():
+            if pos not in counts:
+                new_cells[pos] = age + 1
+    return new_cells
+
+
+WORD_BITS = 64
+PACKED_BAND_ROWS = 1024  # строк за один проход SWAR, ограничивает временные массивы
+
+
+def pack_rows(alive: np.ndarray) -> np.ndarray:
+    """
+    Упаковывает булев массив клеток по 1 биту на клетку.
+
+    Бит b слова w строки соответствует столбцу w * 64 + b;
+    хвост последнего слова заполнен нулями.
+
+    :param alive: np.ndarray, булев массив формы (rows, cols)
+    :return: np.ndarray, массив слов '<u8' формы (rows, ceil(cols / 64))
+    """
+    rows, cols = alive.shape
+    words = -(-cols // WORD_BITS)
+    packed = np.packbits(alive, axis=1, bitorder='little')
+    out = np.zeros((rows, words * 8), dtype=np.uint8)
+    out[:, :packed.shape[1]] = packed
+    return out.view('<u8')
+
+
+def unpack_rows(words: np.ndarray, cols: int) -> np.ndarray:
+    """
+    Распаковывает массив слов обратно в массив клеток.
+
+    :param words: np.ndarray, упакованное поле
+    :param cols: int, количество столбцов поля
+    :return: np.ndarray, массив uint8 из 0 и 1 формы (rows, cols)
+    """
+    raw = words.astype('<u8', copy=False).view(np.uint8)
+    return np.unpackbits(raw, axis=1, count=cols, bitorder='little')
+
+
+def count_neighbors_swar(words: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Считает число соседей сразу для 64 клеток в каждом слове.
+
+    Сдвиги слов дают битовые плоскости соседей, которые складываются
+    логикой сумматоров: сначала тройки клеток в каждой строке, затем
+    суммы трёх соседних строк. Строки за пределами массива мёртвые.
+
+    :param words: np.ndarray, упакованное поле
+    :return: tuple, биты (s0, s1, s2, s3) числа соседей, s0 — младший
+    """
+    def west(a):
+        out = a << 1
+        out[:, 1:] |= a[:, :-1] >> 63
+        return out
+
+    def east(a):
+        out = a >> 1
+        out[:, :-1] |= a[:, 1:] << 63
+        return out
+
+    def above(a):
+        out = np.zeros_like(a)
+        out[1:] = a[:-1]
+        return out
+
+    def below(a):
+        out = np.zeros_like(a)
+        out[:-1] = a[1:]
+        return out
+
+    w, e = west(words), east(words)
+
+    # Суммы по строке: три клетки (для соседних строк) и две (для своей)
+    low3 = w ^ words ^ e
+    high3 = (w & words) | (e & (w | words))
+    low2, high2 = w ^ e, w & e
+
+    a0, a1 = above(low3), above(high3)
+    b0, b1 = below(low3), below(high3)
+
+    s0 = a0 ^ low2 ^ b0
+    carry = (a0 & low2) | (b0 & (a0 | low2))
+    twos = a1 ^ high2 ^ b1
+    fours = (a1 & high2) | (b1 & (a1 | high2))
+
+    s1 = twos ^ carry
+    fours_carry = twos & carry
+    s2 = fours ^ fours_carry
+    s3 = fours & fours_carry
+    return s0, s1, s2, s3
+
+
+def _count_equals(bits: Tuple[np.ndarray, ...], n: int) -> np.ndarray:
+    mask = None
+    for i, bit in enumerate(bits):
+        term = bit if n >> i & 1 else ~bit
+        mask = term if mask is None else mask & term
+    return mask
+
+
+def compile_swar_rule(rule: np.ndarray):
+    """
+    Компилирует таблицу переходов в функцию над битовыми плоскостями.
+
+    Для B3/S23 используется готовое минимизированное выражение, для
+    остальных правил — объединение масок «соседей ровно n» по числам n
+    из таблицы; маски считаются один раз на шаг и общие для B и S.
+
+    :param rule: np.ndarray, таблица переходов parse_rule
+    :return: функция (биты числа соседей, текущие слова) -> слова следующего поколения
+    """
+    if np.array_equal(rule, LIFE_RULE):
+        # Рождение при 3 соседях, выживание при 2 или 3
+        return lambda bits, words: ~bits[3] & ~bits[2] & bits[1] & (bits[0] | words)
+
+    born = np.flatnonzero(rule[0]).tolist()
+    survive = np.flatnonzero(rule[1]).tolist()
+
+    def apply(bits, words):
+        equals = {n: _count_equals(bits, n) for n in set(born) | set(survive)}
+        result = np.zeros_like(words)
+        for n in born:
+            result |= equals[n] & ~words
+        for n in survive:
+            result |= equals[n] & words
+        return result
+
+    return apply
+
+
+class BitBoard:
+    """
+    Компактное поле: 1 бит на клетку в словах uint64.
+
+    Возраст клеток хранится в отдельном массиве ages только если он
+    нужен для раскраски; без него все живые клетки имеют возраст 1.
+    """
+
+    def __init__(self, words: np.ndarray, cols: int, ages: np.ndarray = None):
+        self.words = words
+        self.cols = cols
+        self.ages = ages
+
+    @classmethod
+    def from_array(cls, ages: np.ndarray, track_ages: bool = True) -> 'BitBoard':
+        """
+        Создаёт упакованное поле из массива возрастов.
+
+        :param ages: np.ndarray, массив возрастов (0 — мёртвая клетка)
+        :param track_ages: bool, хранить ли возраст клеток
+        :return: BitBoard, упакованное поле
+        """
+        ages = np.asarray(ages)
+        kept = ages.astype(AGE_DTYPE) if track_ages else None
+        return cls(pack_rows(ages > 0), ages.shape[1], kept)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.words.shape[0], self.cols
+
+    def alive(self) -> np.ndarray:
+        """
+        :return: np.ndarray, массив uint8 из 0 и 1
+        """
+        return unpack_rows(self.words, self.cols)
+
+    def to_array(self) -> np.ndarray:
+        """
+        :return: np.ndarray, массив возрастов типа AGE_DTYPE
+        """
+        if self.ages is not None:
+            return self.ages
+        return self.alive().astype(AGE_DTYPE)
+
+    def next_generation(self, rule=None) -> 'BitBoard':
+        """
+        Вычисляет следующее поколение побитовой логикой (SWAR).
+
+        :param rule: функция compile_swar_rule (по умолчанию B3/S23)
+        :return: BitBoard, новое поколение
+        """
+        rule = rule or SWAR_LIFE
+        rows = self.words.shape[0]
+        new_words = np.empty_like(self.words)
+
+        for start in range(0, rows, PACKED_BAND_ROWS):
+            stop = min(start + PACKED_BAND_ROWS, rows)
+            lo, hi = max(start - 1, 0), min(stop + 1, rows)
+            band = self.words[lo:hi]
+
+            born_or_kept = rule(count_neighbors_swar(band), band)
+            new_words[start:stop] = born_or_kept[start - lo:stop - lo]
+
+        tail = self.cols % WORD_BITS
+        if tail:
+            new_words[:, -1] &= np.uint64((1 << tail) - 1)
+
+        ages = None
+        if self.ages is not None:
+            alive = unpack_rows(new_words, self.cols).astype(bool)
+            older = self.ages + (self.ages < MAX_AGE).astype(AGE_DTYPE)
+            ages = np.where(alive, np.where(self.ages > 0, older, 1), 0).astype(AGE_DTYPE)
+        return BitBoard(new_words, self.cols, ages)
+
+
+SWAR_LIFE = compile_swar_rule(LIFE_RULE)
+
+
+class Engine:
+    """
+    Базовый класс движков расчёта поколений.
+
+    Движок хранит поле в удобном для себя виде, продвигает его методом step()
+    и отдаёт текущее поколение методом snapshot() в виде Grid или массива
+    возрастов. Метод close() освобождает ресурсы движка.
+    """
+
+    def __init__(self, grid: Grid, config: Config):
+        pass
+
+    def step(self) -> None:
+        raise NotImplementedError
+
+    def snapshot(self):
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class PythonEngine(Engine):
+    """
+    Эталонный движок: поле хранится как Grid,
+    шаг выполняется функцией next_generation.
+    """
+
+    def __init__(self, grid: Grid, config: Config):
+        self.grid = as_grid(grid)
+        self.rule = parse_rule(config.rule)
+
+    def step(self) -> None:
+        self.grid = next_generation(self.grid, self.rule)
+
+    def snapshot(self) -> Grid:
+        return self.grid
+
+
+class NumpyEngine(Engine):
+    """
+    Векторизованный движок: поле хранится как массив возрастов uint16,
+    шаг выполняется функцией next_generation_numpy.
+    """
+
+    def __init__(self, grid: Grid, config: Config):
+        self.ages = grid_to_array(grid)
+        self.rule = parse_rule(config.rule)
+
+    def step(self) -> None:
+        self.ages = next_generation_numpy(self.ages, self.rule)
+
+    def snapshot(self) -> np.ndarray:
+        return self.ages
+
+
+class SparseEngine(Engine):
+    """
+    Разреженный движок для больших малонаселённых полей: хранит только
+    живые клетки, шаг выполняется функцией next_generation_sparse.
+    """
+
+    def __init__(self, grid: Grid, config: Config):
+        self.rule = parse_rule(config.rule)
+        check_births_from_zero(self.rule, 'sparse')
+        self.rows, self.cols = len(grid), len(grid[0])
+        self.cells = grid_to_cells(grid)
+
+    def step(self) -> None:
+        self.cells = next_generation_sparse(self.cells, self.rows, self.cols, self.rule)
+
+    def snapshot(self) -> np.ndarray:
+        return cells_to_array(self.cells, self.rows, self.cols)
+
+
+class BitPackedEngine(Engine):
+    """
+    Движок на упакованном поле BitBoard: 1 бит на клетку, шаг — SWAR-логикой.
+    Возраст клеток хранится, только если включена раскраска по возрасту.
+    """
+
+    def __init__(self, grid, config: Config):
+        if isinstance(grid, BitBoard):
+            self.board = grid
+            if config.age_colors and grid.ages is None:
+                self.board = BitBoard(grid.words, grid.cols, grid.to_array())
+        else:
+            self.board = BitBoard.from_array(grid_to_array(grid), config.age_colors)
+        self.rule = compile_swar_rule(parse_rule(config.rule))
+
+    def step(self) -> None:
+        self.board = self.board.next_generation(self.rule)
+
+    def snapshot(self) -> BitBoard:
+        return self.board
+
+
+class QuadNode:
+    """
+    Узел квадродерева HashLife: квадрат 2**level x 2**level клеток.
+
+    Листья (level == 0) — отдельные клетки, population равно 0 или 1.
+    Узлы канонизируются в HashLife.join, поэтому одинаковые квадраты
+    представлены одним и тем же объектом.
+    """
+
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'population')
+
+    def __init__(self, level: int, nw, ne, sw, se, population: int):
+        self.level = level
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.population = population
+
+
+class HashLife:
+    """
+    Мемоизированное квадродерево (алгоритм HashLife, Gosper, 1984).
+
+    Хранит таблицу канонических узлов и кэш результатов successor.
+    Оба кэша ограничены cache_size: кэш результатов вытесняет давно
+    не использованные записи, а переполненная таблица узлов очищается
+    целиком между прыжками advance. Очистка влияет только на скорость —
+    узлы, на которые есть ссылки, остаются корректными.
+
+    Моделируется бесконечная плоскость: в отличие от next_generation,
+    клетки за краем поля не считаются мёртвыми навсегда.
+    """
+
+    def __init__(self, cache_size: int, rule: np.ndarray = LIFE_RULE):
+        self.cache_size = cache_size
+        self.rule = rule.tolist()
+        self.nodes: Dict[tuple, QuadNode] = {}
+        self.results: OrderedDict = OrderedDict()
+        self.dead = QuadNode(0, None, None, None, None, 0)
+        self.alive = QuadNode(0, None, None, None, None, 1)
+        self._empty = [self.dead]
+
+    def join(self, nw: QuadNode, ne: QuadNode, sw: QuadNode, se: QuadNode) -> QuadNode:
+        """
+        Возвращает канонический узел из четырёх квадрантов.
+        """
+        key = (nw, ne, sw, se)
+        node = self.nodes.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = QuadNode(nw.level + 1, nw, ne, sw, se, population)
+            self.nodes[key] = node
+        return node
+
+    def empty(self, level: int) -> QuadNode:
+        """
+        Возвращает пустой узел заданного уровня.
+        """
+        while len(self._empty) <= level:
+            e = self._empty[-1]
+            self._empty.append(QuadNode(e.level + 1, e, e, e, e, 0))
+        return self._empty[level]
+
+    def build(self, cells: List[Tuple[int, int]], level: int, y: int = 0, x: int = 0) -> QuadNode:
+        """
+        Строит узел уровня level из списка живых клеток (строка, столбец)
+        с левым верхним углом в точке (y, x).
+        """
+        if not cells:
+            return self.empty(level)
+        if level == 0:
+            return self.alive
+
+        half = 1 << (level - 1)
+        quadrants = ([], [], [], [])
+        for r, c in cells:
+            quadrants[(r >= y + half) * 2 + (c >= x + half)].append((r, c))
+        return self.join(
+            self.build(quadrants[0], level - 1, y, x),
+            self.build(quadrants[1], level - 1, y, x + half),
+            self.build(quadrants[2], level - 1, y + half, x),
+            self.build(quadrants[3], level - 1, y + half, x + half),
+        )
+
+    def centre(self, node: QuadNode) -> QuadNode:
+        """
+        Помещает узел в центр пустого узла на уровень выше.
+        """
+        e = self.empty(node.level - 1)
+        return self.join(
+            self.join(e, e, e, node.nw),
+            self.join(e, e, node.ne, e),
+            self.join(e, node.sw, e, e),
+            self.join(node.se, e, e, e),
+        )
+
+    def life_4x4(self, node: QuadNode) -> QuadNode:
+        """
+        Вычисляет центральный квадрат 2x2 узла 4x4 через одно поколение.
+        """
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        cells = (
+            (nw.nw, nw.ne, ne.nw, ne.ne),
+            (nw.sw, nw.se, ne.sw, ne.se),
+            (sw.nw, sw.ne, se.nw, se.ne),
+            (sw.sw, sw.se, se.sw, se.se),
+        )
+
+        result = []
+        for r in (1, 2):
+            for c in (1, 2):
+                neighbors = sum(
+                    cells[r + dy][c + dx].population for dy, dx in NEIGHBOR_OFFSETS
+                )
+                alive = self.rule[cells[r][c].population][neighbors]
+                result.append(self.alive if alive else self.dead)
+        return self.join(*result)
+
+    def successor(self, node: QuadNode, j: int) -> QuadNode:
+        """
+        Возвращает центральный квадрант узла через 2**j поколений.
+
+        :param node: QuadNode, узел уровня не ниже 2
+        :param j: int, показатель степени, не больше node.level - 2
+        :return: QuadNode, узел уровня node.level - 1
+        """
+        if node.population == 0:
+            return node.nw
+
+        j = min(j, node.level - 2)
+        key = (node, j)
+        result = self.results.get(key)
+        if result is not None:
+            self.results.move_to_end(key)
+            return result
+
+        if node.level == 2:
+            result = self.life_4x4(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            join, successor = self.join, self.successor
+            c1 = successor(nw, j)
+            c2 = successor(join(nw.ne, ne.nw, nw.se, ne.sw), j)
+            c3 = successor(ne, j)
+            c4 = successor(join(nw.sw, nw.se, sw.nw, sw.ne), j)
+            c5 = successor(join(nw.se, ne.sw, sw.ne, se.nw), j)
+            c6 = successor(join(ne.sw, ne.se, se.nw, se.ne), j)
+            c7 = successor(sw, j)
+            c8 = successor(join(sw.ne, se.nw, sw.se, se.sw), j)
+            c9 = successor(se, j)
+
+            if j < node.level - 2:
+                # Четверть шага уже сделана: берём центральные части без второго прохода
+                result = join(
+                    join(c1.se, c2.sw, c4.ne, c5.nw),
+                    join(c2.se, c3.sw, c5.ne, c6.nw),
+                    join(c4.se, c5.sw, c7.ne, c8.nw),
+                    join(c5.se, c6.sw, c8.ne, c9.nw),
+                )
+            else:
+                result = join(
+                    successor(join(c1, c2, c4, c5), j),
+                    successor(join(c2, c3, c5, c6), j),
+                    successor(join(c4, c5, c7, c8), j),
+                    successor(join(c5, c6, c8, c9), j),
+                )
+
+        self.results[key] = result
+        if len(self.results) > self.cache_size:
+            self.results.popitem(last=False)
+        return result
+
+    def advance(self, node: QuadNode, y: int, x: int, steps: int) -> Tuple[QuadNode, int, int]:
+        """
+        Продвигает узел на steps поколений прыжками по степеням двойки.
+
+        :param node: QuadNode, корень дерева
+        :param y: int, строка левого верхнего угла корня на поле
+        :param x: int, столбец левого верхнего угла корня на поле
+        :param steps: int, количество поколений
+        :return: tuple, (новый корень, строка и столбец его левого верхнего угла)
+        """
+        j = 0
+        while steps:
+            if steps & 1:
+                # Живые клетки должны лежать в центральной четверти корня,
+                # иначе за 2**j поколений они выйдут за пределы результата
+                while node.level < j + 3 or self._inner(node).population != node.population:
+                    shift = 1 << (node.level - 1)
+                    node = self.centre(node)
+                    y, x = y - shift, x - shift
+
+                if len(self.nodes) > self.cache_size:
+                    self.collect()
+
+                shift = 1 << (node.level - 2)
+                node = self.successor(node, j)
+                y, x = y + shift, x + shift
+            steps >>= 1
+            j += 1
+        return node, y, x
+
+    def collect(self) -> None:
+        """
+        Очищает таблицу узлов и кэш результатов.
+        """
+        self.nodes.clear()
+        self.results.clear()
+
+    def _inner(self, node: QuadNode) -> QuadNode:
+        """
+        Возвращает центральный квадрат узла со стороной в четверть стороны узла.
+        """
+        return self.join(node.nw.se.se, node.ne.sw.sw, node.sw.ne.ne, node.se.nw.nw)
+
+    def live_cells(self, node: QuadNode, y: int, x: int,
+                   rows: int, cols: int) -> List[Tuple[int, int]]:
+        """
+        Перечисляет живые клетки узла, попадающие в окно поля rows x cols.
+        """
+        cells: List[Tuple[int, int]] = []
+        stack = [(node, y, x)]
+        while stack:
+            node, y, x = stack.pop()
+            size = 1 << node.level
+            if (node.population == 0 or y >= rows or x >= cols
+                    or y + size <= 0 or x + size <= 0):
+                continue
+            if node.level == 0:
+                cells.append((y, x))
+                continue
+            half = size >> 1
+            stack.append((node.nw, y, x))
+            stack.append((node.ne, y, x + half))
+            stack.append((node.sw, y + half, x))
+            stack.append((node.se, y + half, x + half))
+        return cells
+
+
+class HashLifeEngine(Engine):
+    """
+    Движок для очень длинных прогонов на основе HashLife.
+
+    Поколения пропускаются прыжками по степеням двойки, поэтому
+    промежуточные состояния не выводятся.
+
+    HashLife не хранит возраст клеток. Чтобы цвета age_color совпадали
+    с эталоном, последние AGE_COLOR_LIMIT поколений досчитываются
+    векторизованным движком: возраст клеток, живых к началу этого хвоста,
+    отсчитывается от 1, а к концу прогона достигает предела, после которого
+    цвет уже не меняется. Поэтому PNG совпадает с эталоном, а значения
+    возраста в текстовом выводе ограничены снизу длиной хвоста.
+
+    HashLife моделирует бесконечную плоскость, поэтому результат совпадает
+    с эталоном, пока активность не доходит до края поля; клетки за краем
+    отбрасываются при материализации.
+    """
+
+    def __init__(self, grid: Grid, config: Config):
+        self.rule = parse_rule(config.rule)
+        check_births_from_zero(self.rule, 'hashlife')
+        self.rows, self.cols = len(grid), len(grid[0])
+        self.life = HashLife(config.hashlife_cache_size, self.rule)
+        self.ages = grid_to_array(grid)
+
+    def advance(self, steps: int) -> None:
+        tail = min(steps, AGE_COLOR_LIMIT)
+        ages = self.ages
+
+        if steps > tail:
+            level = max(self.rows, self.cols, 8).bit_length()
+            cells = [(int(r), int(c)) for r, c in zip(*np.nonzero(ages))]
+            root = self.life.build(cells, level)
+            root, y, x = self.life.advance(root, 0, 0, steps - tail)
+
+            cells = self.life.live_cells(root, y, x, self.rows, self.cols)
+            ages = cells_to_array(dict.fromkeys(cells, 1), self.rows, self.cols)
+
+        for _ in range(tail):
+            ages = next_generation_numpy(ages, self.rule)
+        self.ages = ages
+
+    def step(self) -> None:
+        self.advance(1)
+
+    def snapshot(self) -> np.ndarray:
+        return self.ages
+
+
+_worker_memory: List['SharedMemory'] = []  # блоки общей памяти, подключённые в процессе-воркере
+_worker_boards: List[np.ndarray] = []      # поля поверх этих блоков
+
+
+def _attach_boards(names: List[str], shape: Tuple[int, int]) -> None:
+    """
+    Подключает процесс-воркер к двум буферам поля в общей памяти.
+
+    :param names: list, имена блоков SharedMemory
+    :param shape: tuple, размер поля (rows, cols)
+    :return: None
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    for name in names:
+        memory = SharedMemory(name=name)
+        _worker_memory.append(memory)
+        _worker_boards.append(np.ndarray(shape, dtype=AGE_DTYPE, buffer=memory.buf))
+
+
+def _step_band(source: int, start: int, stop: int, rule: np.ndarray) -> None:
+    """
+    Вычисляет строки start..stop-1 следующего поколения в процессе-воркере.
+
+    Полоса читается из буфера source вместе с соседними строками (ореол)
+    и записывается в другой буфер, поэтому полосы не пересекаются по записи.
+
+    :param source: int, индекс буфера с текущим поколением (0 или 1)
+    :param start: int, первая строка полосы
+    :param stop: int, строка, следующая за последней
+    :param rule: np.ndarray, таблица переходов parse_rule
+    :return: None
+    """
+    current, target = _worker_boards[source], _worker_boards[1 - source]
+    lo, hi = max(start - 1, 0), min(stop + 1, current.shape[0])
+    band = next_generation_numpy(current[lo:hi], rule)
+    target[start:stop] = band[start - lo:stop - lo]
+
+
+class ParallelEngine(Engine):
+    """
+    Многопроцессный движок для огромных полей.
+
+    Поле хранится в двух буферах multiprocessing.shared_memory: текущее
+    поколение и следующее. Строки делятся на полосы по числу воркеров
+    ProcessPoolExecutor; каждый воркер считает свою полосу с ореолом в
+    одну строку. Между процессами передаются только номера строк, само
+    поле не сериализуется.
+    """
+
+    def __init__(self, grid: Grid, config: Config):
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing.shared_memory import SharedMemory
+
+        ages = grid_to_array(grid)
+        rows = ages.shape[0]
+        workers = max(1, min(config.workers, rows))
+        self.rule = parse_rule(config.rule)
+
+        self.memory = [SharedMemory(create=True, size=max(ages.nbytes, 1)) for _ in range(2)]
+        self.boards = [np.ndarray(ages.shape, dtype=AGE_DTYPE, buffer=m.buf) for m in self.memory]
+        self.boards[0][:] = ages
+        self.current = 0
+
+        bounds = [rows * i // workers for i in range(workers + 1)]
+        self.starts, self.stops = bounds[:-1], bounds[1:]
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach_boards,
+            initargs=([m.name for m in self.memory], ages.shape)
+        )
+
+    def step(self) -> None:
+        sources = [self.current] * len(self.starts)
+        list(self.pool.map(_step_band, sources, self.starts, self.stops, repeat(self.rule)))
+        self.current = 1 - self.current
+
+    def snapshot(self) -> np.ndarray:
+        return self.boards[self.current].copy()
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        self.boards = []
+        for memory in self.memory:
+            memory.close()
+            memory.unlink()
+        self.memory = []
+
+
+ENGINES = {
+    'python': PythonEngine,
+    'numpy': NumpyEngine,
+    'sparse': SparseEngine,
+    'hashlife': HashLifeEngine,
+    'parallel': ParallelEngine,
+    'bitpacked': BitPackedEngine,
+}
+
+
+def create_engine(grid: Grid, config: Config):
+    """
+    Создаёт движок расчёта поколений, указанный в конфигурации.
+
+    :param grid: Grid, начальное состояние поля
+    :param config: Config, параметры конфигурации
+    :return: Engine, движок расчёта поколений
+    :raises ValueError: если движок с таким именем не существует
+    """
+    try:
+        engine_cls = ENGINES[config.engine]
+    except KeyError:
+        raise ValueError(f'Неизвестный движок "{config.engine}"')
+    return engine_cls(grid, config)
+
+
+def alive_mask(board) -> np.ndarray:
+    """
+    Возвращает булеву маску живых клеток поля любого движка.
+
+    :param board: Grid, np.ndarray или BitBoard, игровое поле
+    :return: np.ndarray, булев массив формы (rows, cols)
+    """
+    if isinstance(board, BitBoard):
+        return board.alive().astype(bool)
+    return np.asarray(board) > 0
+
+
+def zobrist_keys(indices: np.ndarray) -> np.ndarray:
+    """
+    Вычисляет псевдослучайные 64-битные ключи клеток по их номерам
+    (перемешивание splitmix64). Ключи не хранятся в таблице, поэтому
+    память не растёт с площадью поля.
+
+    :param indices: np.ndarray, линейные номера клеток
+    :return: np.ndarray, ключи uint64
+    """
+    z = indices.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class CycleDetector:
+    """
+    Обнаруживает повторение поля (натюрморты и осцилляторы).
+
+    Хеш Зобриста маски живых клеток обновляется инкрементально:
+    XOR ключей только тех клеток, которые родились или погибли.
+    Повтор определяется по совпадению 64-битного хеша с одним из
+    предыдущих; вероятностью коллизии пренебрегаем.
+    """
+
+    def __init__(self):
+        self.history: Dict[int, int] = {}
+        self.hash = 0
+        self.previous = None
+
+    def update(self, board, step: int):
+        """
+        Учитывает очередное поколение.
+
+        :param board: поле любого движка
+        :param step: int, номер поколения
+        :return: tuple (start, period) — поколение начала цикла и его период,
+                 или None, если поле ещё не повторялось
+        """
+        alive = alive_mask(board)
+        if self.previous is None:
+            changed = np.flatnonzero(alive)
+        else:
+            changed = np.flatnonzero(alive != self.previous)
+        if changed.size:
+            self.hash ^= int(np.bitwise_xor.reduce(zobrist_keys(changed)))
+        self.previous = alive
+
+        start = self.history.get(self.hash)
+        if start is not None:
+            return start, step - start
+        self.history[self.hash] = step
+        return None
+
+
+def extrapolate_ages(ages: np.ndarray, period: int, cycles: int) -> np.ndarray:
+    """
+    Переносит возраст клеток на cycles периодов вперёд без расчёта поколений.
+
+    Маска живых клеток через целое число периодов не меняется. Клетка, живая
+    во всех фазах цикла, стареет на period за период, и только у таких клеток
+    возраст больше period; возраст остальных клеток повторяется с периодом цикла.
+
+    :param ages: np.ndarray, возраст клеток в поколении внутри цикла
+    :param period: int, период цикла
+    :param cycles: int, на сколько периодов перенести
+    :return: np.ndarray, возраст клеток через cycles * period поколений
+    """
+    ages = np.minimum(np.asarray(ages, dtype=np.int64), MAX_AGE)
+    older = np.minimum(ages + cycles * period, MAX_AGE)
+    return np.where(ages > period, older, ages).astype(AGE_DTYPE)
+
+
+class RunMetrics:
+    """
+    Метрики прогона: время каждого этапа по поколениям (шаг движка, снимок,
+    текстовый вывод, отрисовка, кодирование кадра, PNG), число живых клеток,
+    объём записанных данных и размер кадров.
+
+    Этапы замеряются парой вызовов clock() / add(); при выключенных метриках
+    вместо RunMetrics передаётся NULL_METRICS, методы которого ничего не делают,
+    поэтому накладные расходы сводятся к паре пустых вызовов на этап.
+    """
+
+    enabled = True
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.setup: Dict[str, float] = {}
+        self.times: Dict[int, Dict[str, float]] = {}
+        self.counts: Dict[int, Dict[str, int]] = {}
+
+    def add(self, step: int, stage: str, start: float) -> None:
+        """
+        Добавляет время этапа, начатого в момент start, к поколению step.
+
+        :param step: int, номер поколения
+        :param stage: str, имя этапа
+        :param start: float, результат clock() перед началом этапа
+        :return: None
+        """
+        elapsed = time.perf_counter() - start
+        record = self.times.setdefault(step, {})
+        record[stage] = record.get(stage, 0.0) + elapsed
+
+    def add_setup(self, stage: str, start: float) -> None:
+        self.setup[stage] = self.setup.get(stage, 0.0) + time.perf_counter() - start
+
+    def count(self, step: int, name: str, value: int) -> None:
+        self.counts.setdefault(step, {})[name] = value
+
+    def report(self) -> dict:
+        """
+        Сводка метрик: итоги по этапам и счётчикам и записи по поколениям.
+
+        :return: dict, данные для файла метрик
+        """
+        wall = time.perf_counter() - self.started
+        stages = {}
+        for record in self.times.values():
+            for stage, elapsed in record.items():
+                stages.setdefault(stage, []).append(elapsed)
+        counters = {}
+        for record in self.counts.values():
+            for name, value in record.items():
+                counters.setdefault(name, []).append(value)
+
+        steps = sorted(set(self.times) | set(self.counts))
+        return {
+            'wall_seconds': wall,
+            'setup_seconds': self.setup,
+            'stages': {
+                stage: {
+                    'calls': len(values),
+                    'total': sum(values),
+                    'mean': sum(values) / len(values),
+                    'max': max(values),
+                    'share': sum(values) / wall if wall else 0.0,
+                }
+                for stage, values in stages.items()
+            },
+            'counters': {
+                name: {'total': sum(values), 'mean': sum(values) / len(values), 'max': max(values)}
+                for name, values in counters.items()
+            },
+            'generations': [
+                {'step': step, 'seconds': self.times.get(step, {}), **self.counts.get(step, {})}
+                for step in steps
+            ],
+        }
+
+    def print_summary(self, report: dict = None) -> None:
+        report = report or self.report()
+        print(f'{"этап":<12} {"вызовов":>8} {"всего, с":>10} {"среднее, мс":>12} '
+              f'{"макс, мс":>10} {"доля":>6}')
+        for stage, elapsed in report['setup_seconds'].items():
+            print(f'{stage:<12} {1:>8} {elapsed:10.3f} {elapsed * 1000:12.3f} '
+                  f'{elapsed * 1000:10.3f} {elapsed / report["wall_seconds"]:6.1%}')
+        for stage, row in sorted(report['stages'].items(), key=lambda item: -item[1]['total']):
+            print(f'{stage:<12} {row["calls"]:>8} {row["total"]:10.3f} {row["mean"] * 1000:12.3f} '
+                  f'{row["max"] * 1000:10.3f} {row["share"]:6.1%}')
+        for name, row in report['counters'].items():
+            print(f'{name:<12} всего {row["total"]}, в среднем {row["mean"]:.1f}, максимум {row["max"]}')
+        print(f'Общее время: {report["wall_seconds"]:.3f} с')
+
+    def write(self, filename: str) -> dict:
+        """
+        Записывает метрики в JSON-файл и возвращает их.
+
+        :param filename: str, путь к файлу метрик
+        :return: dict, записанная сводка
+        :raises OSError: если произошла ошибка при записи файла
+        """
+        report = self.report()
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            raise OSError(f'Ошибка записи в файл "{filename}": {e}')
+        return report
+
+
+class NullMetrics:
+    """
+    Выключенные метрики: все методы ничего не делают.
+    """
+
+    enabled = False
+
+    @staticmethod
+    def clock() -> float:
+        return 0.0
+
+    def add(self, step: int, stage: str, start: float) -> None:
+        pass
+
+    def add_setup(self, stage: str, start: float) -> None:
+        pass
+
+    def count(self, step: int, name: str, value: int) -> None:
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def age_color(age: int, base_color: tuple) -> tuple:
+    """
+    Вычисляет цвет клетки в зависимости от её возраста.
+
+    Чем больше возраст клетки, тем светлее её цвет.
+
+    :param age: int, возраст клетки
+    :param base_color: tuple, базовый RGB-цвет
+    :return: tuple, RGB-цвет клетки
+    """
+    factor = min(age * AGE_COLOR_STEP, 255)
+    return tuple(min(c + factor, 255) for c in base_color)
+
+
+BACKGROUND_INDEX = 0  # индексы цветов в палитре frame_palette
+BORDER_INDEX = 1
+TRANSPARENT_INDEX = BORDER_INDEX + AGE_COLOR_LIMIT + 1  # прозрачный цвет частичных кадров GIF
+
+
+def cell_indices(board, config: Config) -> np.ndarray:
+    """
+    Вычисляет индекс цвета палитры frame_palette для каждой клетки поля.
+
+    Возраст старше AGE_COLOR_LIMIT цвет не меняет, поэтому индексы клеток
+    соседних поколений различаются только там, где кадр нужно перерисовать.
+
+    :param board: поле любого движка
+    :param config: Config, параметры конфигурации
+    :return: np.ndarray, массив uint8 формы (rows, cols)
+    """
+    ages = as_array(board)
+    if config.age_colors:
+        cells = np.minimum(ages, AGE_COLOR_LIMIT).astype(np.uint8)
+    else:
+        cells = (ages > 0).astype(np.uint8)
+    return np.where(cells > 0, cells + BORDER_INDEX, BACKGROUND_INDEX).astype(np.uint8)
+
+
+def render_indices(board, config: Config) -> np.ndarray:
+    """
+    Строит кадр поколения как массив индексов палитры frame_palette.
+
+    Кадр собирается целиком средствами NumPy: индекс цвета каждой клетки
+    берётся по её возрасту (возраст старше AGE_COLOR_LIMIT не меняет цвет),
+    клетки растягиваются до cell_size пикселей, после чего поверх
+    накладываются линии сетки: каждая cell_size-я строка и столбец пикселей.
+    Результат совпадает с попиксельной отрисовкой прямоугольников ImageDraw,
+    где рамка каждой клетки рисуется поверх заливки соседей.
+
+    :param board: поле любого движка
+    :param config: Config, параметры конфигурации
+    :return: np.ndarray, массив uint8 формы (rows * cell_size, cols * cell_size)
+    """
+    return _paint_cells(cell_indices(board, config), config.cell_size)
+
+
+def _paint_cells(cells: np.ndarray, size: int) -> np.ndarray:
+    rows, cols = cells.shape
+    pixels = np.empty((rows, size, cols, size), dtype=np.uint8)
+    pixels[...] = cells[:, None, :, None]
+    pixels = pixels.reshape(rows * size, cols * size)
+    pixels[::size, :] = BORDER_INDEX
+    pixels[:, ::size] = BORDER_INDEX
+    return pixels
+
+
+class FrameRenderer:
+    """
+    Инкрементальная отрисовка кадров.
+
+    Хранит индексы цветов клеток и пиксели предыдущего кадра. Для нового
+    поколения перерисовываются только клетки, цвет которых изменился,
+    поэтому время отрисовки зависит от активности на поле, а не от его площади.
+    """
+
+    def __init__(self, config: Config):
+        self.size = config.cell_size
+        self.config = config
+        self.cells = None
+        self.pixels = None
+
+    def render(self, board) -> Tuple[np.ndarray, tuple]:
+        """
+        Обновляет кадр до состояния поля.
+
+        Возвращаемый массив пикселей принадлежит отрисовщику и изменяется
+        следующим вызовом render().
+
+        :param board: поле любого движка
+        :return: (np.ndarray, tuple), пиксели кадра (как render_indices) и изменения:
+                 None, если кадр нарисован целиком (первый кадр или другой размер поля),
+                 иначе (top, left, patch) — прямоугольник пикселей, охватывающий
+                 изменившиеся клетки, где пиксели неизменившихся клеток равны
+                 TRANSPARENT_INDEX; пустой patch — кадр не изменился
+        """
+        cells = cell_indices(board, self.config)
+        if self.cells is None or self.cells.shape != cells.shape:
+            self.cells = cells
+            self.pixels = _paint_cells(cells, self.size)
+            return self.pixels, None
+
+        changed = cells != self.cells
+        self.cells = cells
+        rows, cols = np.nonzero(changed)
+        if rows.size == 0:
+            return self.pixels, (0, 0, np.empty((0, 0), dtype=np.uint8))
+
+        size = self.size
+        view = self.pixels.reshape(cells.shape[0], size, cells.shape[1], size)
+        view[rows, :, cols, :] = cells[rows, cols][:, None, None]
+        view[rows, 0, cols, :] = BORDER_INDEX
+        view[rows, :, cols, 0] = BORDER_INDEX
+
+        top, bottom = rows.min(), rows.max() + 1
+        left, right = cols.min(), cols.max() + 1
+        mask = changed[top:bottom, left:right].repeat(size, axis=0).repeat(size, axis=1)
+        patch = self.pixels[top * size:bottom * size, left * size:right * size]
+        return self.pixels, (int(top) * size, int(left) * size,
+                             np.where(mask, patch, TRANSPARENT_INDEX).astype(np.uint8))
+
+
+def render_frame(grid: Grid, config: Config) -> 'Image.Image':
+    """
+    Рисует изображение текущего поколения игрового поля.
+
+    :param grid: Grid, текущее состояние поля
+    :param config: Config, параметры конфигурации
+    :return: Image, RGB-изображение поля
+    """
+    return indexed_image(render_indices(grid, config), frame_palette(config)).convert('RGB')
+
+
+def indexed_image(indices: np.ndarray, palette: List[tuple]) -> 'Image.Image':
+    """
+    Создаёт изображение в режиме 'P' из массива индексов палитры.
+
+    Pillow импортируется здесь, при первой отрисовке, а не при загрузке
+    модуля: прогонам без отрисовки (--no-render, пакетный режим, тесты
+    ввода-вывода) он не нужен.
+
+    :param indices: np.ndarray, массив uint8 формы (height, width)
+    :param palette: list, RGB-цвета палитры
+    :return: Image, изображение с палитрой
+    """
+    from PIL import Image
+
+    image = Image.fromarray(indices)
+    image.putpalette([channel for color in palette for channel in color])
+    return image
+
+
+def png_name(step: int, config: Config) -> str:
+    """
+    :param step: int, номер поколения
+    :param config: Config, параметры конфигурации
+    :return: str, путь к PNG-файлу поколения
+    """
+    return os.path.join(config.gen_images_dir, f'generation_{step:03}.png')
+
+
+def write_png(grid: Grid, step: int, config: Config) -> None:
+    """
+    Создаёт PNG-изображение текущего поколения игрового поля.
+
+    :param grid: Grid, текущее состояние поля
+    :param step: int, номер поколения
+    :param config: Config, параметры конфигурации
+    :return: None
+    """
+    os.makedirs(config.gen_images_dir, exist_ok=True)
+    render_frame(grid, config).save(png_name(step, config))
+
+
+def frame_palette(config: Config) -> List[tuple]:
+    """
+    Составляет палитру всех цветов, которые встречаются в кадрах:
+    фон, рамка и цвета клеток всех возрастов до AGE_COLOR_LIMIT.
+
+    :param config: Config, параметры конфигурации
+    :return: list, RGB-цвета палитры
+    """
+    colors = [config.background_color, config.border_color]  # BACKGROUND_INDEX, BORDER_INDEX
+    colors += [age_color(age, config.base_color) for age in range(1, AGE_COLOR_LIMIT + 1)]
+    return colors
+
+
+class GifWriter:
+    """
+    Потоковая запись GIF-анимации.
+
+    Каждый кадр переводится в общую фиксированную палитру, кодируется
+    и сразу дописывается в файл, поэтому в памяти хранится только
+    текущий кадр независимо от числа поколений.
+
+    Кадры из индексов палитры можно дописывать частично: прямоугольником
+    изменившейся области, где неизменившиеся пиксели прозрачны
+    (TRANSPARENT_INDEX) и сквозь них виден предыдущий кадр.
+
+    Если задано offset, анимация продолжается с контрольной точки: всё после
+    offset отбрасывается, а frames — число уже записанных кадров.
+    """
+
+    def __init__(self, filename: str, palette: List[tuple], duration: int, loop: int = 0,
+                 offset: int = None, frames: int = 0):
+        self.palette = palette
+        # палитра кадров дополняется до TRANSPARENT_INDEX, чтобы он был в таблице цветов GIF
+        self.colors = palette + [palette[BACKGROUND_INDEX]] * (TRANSPARENT_INDEX + 1 - len(palette))
+        self.palette_image = indexed_image(np.zeros((1, 1), dtype=np.uint8), palette)
+        self.duration = duration
+        self.loop = loop
+        if offset is None:
+            self.frames = 0
+            self.file = open(filename, 'wb')
+        else:
+            self.frames = frames
+            self.file = open(filename, 'r+b')
+            self.file.seek(offset)
+            self.file.truncate()
+
+    def append_indices(self, indices: np.ndarray) -> int:
+        """
+        Дописывает кадр, заданный массивом индексов палитры писателя.
+
+        :param indices: np.ndarray, массив uint8 формы (height, width)
+        :return: int, размер закодированного кадра в байтах
+        """
+        return self.append(indexed_image(indices, self.colors))
+
+    def append_patch(self, top: int, left: int, patch: np.ndarray) -> int:
+        """
+        Дописывает частичный кадр: прямоугольник поверх предыдущего кадра.
+
+        :param top: int, верхняя строка прямоугольника в пикселях
+        :param left: int, левый столбец прямоугольника в пикселях
+        :param patch: np.ndarray, индексы палитры uint8; TRANSPARENT_INDEX — пиксель
+                      предыдущего кадра; пустой массив — кадр без изменений
+        :return: int, размер закодированного кадра в байтах
+        :raises ValueError: если в анимации ещё нет полного кадра
+        """
+        if self.frames == 0:
+            raise ValueError('Частичный кадр не может быть первым кадром GIF')
+        if patch.size == 0:
+            patch = np.full((1, 1), TRANSPARENT_INDEX, dtype=np.uint8)
+        return self.append(indexed_image(patch, self.colors), offset=(left, top))
+
+    def append(self, image: 'Image.Image', offset: Tuple[int, int] = None) -> int:
+        """
+        Дописывает кадр в анимацию.
+
+        :param image: Image, RGB-кадр или кадр в палитре писателя
+        :param offset: (int, int), положение (x, y) частичного кадра с прозрачным
+                       TRANSPARENT_INDEX; None — полный кадр
+        :return: int, размер закодированного кадра в байтах
+        """
+        from PIL import GifImagePlugin, Image
+
+        position = self.file.tell()
+        if image.mode != 'P':
+            image = image.quantize(palette=self.palette_image, dither=Image.Dither.NONE)
+
+        if self.frames == 0:
+            header, _ = GifImagePlugin.getheader(
+                image, info={'loop': self.loop, 'duration': self.duration}
+            )
+            self.file.writelines(header)
+
+        if offset is None:
+            data = GifImagePlugin.getdata(image, duration=self.duration)
+        else:
+            # disposal=1: кадр остаётся на экране, следующий рисуется поверх него
+            data = GifImagePlugin.getdata(image, offset=offset, duration=self.duration,
+                                          transparency=TRANSPARENT_INDEX, disposal=1)
+        self.file.writelines(data)
+        self.frames += 1
+        return self.file.tell() - position
+
+    def checkpoint(self) -> Tuple[int, int]:
+        """
+        Сбрасывает записанные кадры на диск.
+
+        :return: (int, int), смещение конца последнего кадра и число кадров
+        """
+        self.file.flush()
+        return self.file.tell(), self.frames
+
+    def close(self) -> None:
+        if self.frames:
+            self.file.write(b';')  # завершающий блок GIF
+        self.file.close()
+
+
+def make_gif(config: Config, metrics=NULL_METRICS) -> None:
+    """
+    Создаёт GIF-анимацию из сгенерированных PNG-изображений.
+
+    Кадры читаются и дописываются в GIF по одному.
+
+    :param config: Config, параметры конфигурации
+    :param metrics: RunMetrics, метрики чтения и кодирования кадров
+    :return: None
+    :raises RuntimeError: если не удалось создать GIF
+    :raises FileNotFoundError: не удалось найти файлы PNG
+    """
+    from PIL import Image
+
+    try:
+        gen_image = sorted(
+            os.path.join(config.gen_images_dir, f)
+            for f in os.listdir(config.gen_images_dir)
+            if f.endswith('.png')
+        )
+
+        if not gen_image:
+            raise FileNotFoundError('Нет PNG файлов для создания GIF')
+
+        gif = GifWriter(config.gif_name, frame_palette(config), config.gif_duration)
+        try:
+            for step, frame in enumerate(gen_image):
+                start = metrics.clock()
+                with Image.open(frame) as image:
+                    image = image.convert('RGB')
+                metrics.add(step, 'load', start)
+
+                start = metrics.clock()
+                size = gif.append(image)
+                metrics.add(step, 'gif', start)
+                metrics.count(step, 'frame_bytes', size)
+        finally:
+            gif.close()
+
+    except Exception as e:
+        raise RuntimeError(f'Ошибка создания GIF: {e}')
+
+
+def parse_args():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Игра Жизнь: генерация PNG и GIF'
+    )
+
+    parser.add_argument(
+        'input_file',
+        help='Файл с начальным состоянием поля'
+    )
+
+    parser.add_argument(
+        'output_file',
+        help='CSV файл для записи поколений'
+    )
+
+    parser.add_argument(
+        'steps',
+        type=int,
+        help='Количество поколений'
+    )
+
+    parser.add_argument(
+        '--format',
+        choices=('text', 'rle', 'delta'),
+        default=Config.output_format,
+        help='Формат файла поколений (по умолчанию: text)'
+    )
+
+    parser.add_argument(
+        '--compress',
+        choices=sorted(COMPRESSORS),
+        default=Config.compression,
+        help='Сжатие файла поколений (по умолчанию: none)'
+    )
+
+    parser.add_argument(
+        '--metrics',
+        metavar='FILE',
+        default=Config.metrics_file,
+        help='Замерять этапы прогона: вывести сводку и записать метрики в JSON-файл'
+    )
+
+    parser.add_argument(
+        '--rule',
+        default=Config.rule,
+        help='Правило в записи B/S, например B36/S23 (HighLife) или B2/S (Seeds) '
+             '(по умолчанию: B3/S23)'
+    )
+
+    parser.add_argument(
+        '--checkpoint-every',
+        type=int,
+        default=Config.checkpoint_every,
+        metavar='N',
+        help='Сохранять контрольную точку каждые N поколений и в конце прогона'
+    )
+
+    parser.add_argument(
+        '--checkpoint',
+        metavar='FILE',
+        default=Config.checkpoint_file,
+        help='Файл контрольной точки (по умолчанию: имя файла поколений + .ckpt)'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Продолжить прогон с контрольной точки: файл поколений и GIF дописываются '
+             'со следующего поколения; параметры вывода должны совпадать с прерванным прогоном'
+    )
+
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Пакетный режим: входной файл — каталог или шаблон (glob) файлов полей, '
+             'выходной — CSV-таблица итогов (население, период, время жизни); '
+             'поля считаются в пуле процессов (--workers) без отрисовки'
+    )
+
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=0,
+        help='Полей в пачке, передаваемой процессу в пакетном режиме (по умолчанию: подбирается)'
+    )
+
+    parser.add_argument(
+        '--no-render',
+        action='store_true',
+        help='Не отрисовывать кадры: только файл поколений, без GIF и PNG '
+             '(Pillow при этом не загружается)'
+    )
+
+    parser.add_argument(
+        '--png',
+        action='store_true',
+        help=f'Дополнительно сохранять PNG каждого поколения в каталог {Config.gen_images_dir}'
+    )
+
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='Записывать текст и кадры в отдельных потоках параллельно с расчётом поколений'
+    )
+
+    parser.add_argument(
+        '--engine',
+        choices=sorted(ENGINES),
+        default=Config.engine,
+        help='Движок расчёта поколений (по умолчанию: python)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=Config.workers,
+        help='Число процессов движка parallel (по умолчанию: число ядер)'
+    )
+
+    parser.add_argument(
+        '--no-age-colors',
+        action='store_true',
+        help='Не раскрашивать клетки по возрасту (движок bitpacked тогда не хранит возраст)'
+    )
+
+    parser.add_argument(
+        '--cycles',
+        choices=('off', 'stop', 'skip'),
+        default=Config.cycle_mode,
+        help='Что делать при повторении поля: off — считать дальше, stop — остановиться, '
+             'skip — экстраполировать итоговое поколение'
+    )
+
+    parser.add_argument(
+        '--hashlife-cache',
+        type=int,
+        default=Config.hashlife_cache_size,
+        help='Предельное число узлов в кэше HashLife'
+    )
+
+    return parser.parse_args()
+
+
+def write_frame(board, step: int, config: Config, gif: GifWriter,
+                metrics=NULL_METRICS, renderer: FrameRenderer = None) -> None:
+    """
+    Дописывает кадр поколения в GIF и, если включено config.save_png,
+    сохраняет его отдельным PNG-файлом.
+
+    С отрисовщиком renderer перерисовываются только изменившиеся клетки,
+    а в GIF дописывается частичный кадр с изменившейся областью.
+
+    :param board: поле любого движка
+    :param step: int, номер поколения
+    :param config: Config, параметры конфигурации
+    :param gif: GifWriter, писатель анимации
+    :param metrics: RunMetrics, метрики этапов
+    :param renderer: FrameRenderer, отрисовщик предыдущих кадров; None — кадр рисуется целиком
+    :return: None
+    """
+    start = metrics.clock()
+    if renderer is not None:
+        indices, update = renderer.render(board)
+    else:
+        indices, update = render_indices(board, config), None
+    metrics.add(step, 'render', start)
+
+    start = metrics.clock()
+    size = gif.append_indices(indices) if update is None else gif.append_patch(*update)
+    metrics.add(step, 'gif', start)
+    metrics.count(step, 'frame_bytes', size)
+
+    if config.save_png:
+        start = metrics.clock()
+        os.makedirs(config.gen_images_dir, exist_ok=True)
+        indexed_image(indices, gif.palette).convert('RGB').save(png_name(step, config))
+        metrics.add(step, 'png', start)
+
+
+def write_steps(board, step: int, writer: StepWriter, metrics=NULL_METRICS) -> None:
+    """
+    Дописывает поколение в файл поколений.
+
+    :param board: поле любого движка
+    :param step: int, номер поколения
+    :param writer: StepWriter, писатель файла поколений
+    :param metrics: RunMetrics, метрики этапов
+    :return: None
+    """
+    start = metrics.clock()
+    size = writer.write(board, step)
+    metrics.add(step, 'text', start)
+    metrics.count(step, 'text_bytes', size)
+
+
+def write_generation(board, step: int, config: Config, writer: StepWriter, gif: GifWriter,
+                     metrics=NULL_METRICS, renderer: FrameRenderer = None) -> None:
+    """
+    Записывает поколение во все выходы: файл поколений и кадр анимации.
+
+    :param board: поле любого движка
+    :param step: int, номер поколения
+    :param config: Config, параметры конфигурации
+    :param writer: StepWriter, писатель файла поколений
+    :param gif: GifWriter, писатель анимации или None, если отрисовка выключена
+    :param metrics: RunMetrics, метрики этапов
+    :param renderer: FrameRenderer, отрисовщик для частичных кадров
+    :return: None
+    """
+    write_steps(board, step, writer, metrics)
+    if gif is not None:
+        write_frame(board, step, config, gif, metrics, renderer)
+
+
+class OutputPipeline:
+    """
+    Конвейер вывода поколений.
+
+    Симуляция передаёт в submit() неизменяемые снимки поля, которые
+    раскладываются по ограниченным очередям. Отдельные потоки записывают
+    текстовый файл и кодируют кадры, поэтому расчёт следующего поколения
+    идёт одновременно с выводом предыдущих. Когда очередь заполнена,
+    submit() ждёт, так что в памяти не больше queue_size снимков на этап.
+    """
+
+    _STOP = object()
+
+    def __init__(self, config: Config, writer: StepWriter, gif: GifWriter,
+                 metrics=NULL_METRICS, renderer: FrameRenderer = None):
+        stages = [lambda board, step: write_steps(board, step, writer, metrics)]
+        if gif is not None:
+            stages.append(lambda board, step: write_frame(board, step, config, gif, metrics, renderer))
+
+        self.error = None
+        self.queues = []
+        self.threads = []
+        for stage in stages:
+            tasks = queue.Queue(maxsize=config.queue_size)
+            thread = threading.Thread(target=self._work, args=(stage, tasks), daemon=True)
+            thread.start()
+            self.queues.append(tasks)
+            self.threads.append(thread)
+
+    def _work(self, stage, tasks: queue.Queue) -> None:
+        while True:
+            item = tasks.get()
+            try:
+                if item is self._STOP:
+                    return
+                if self.error is None:
+                    try:
+                        stage(*item)
+                    except Exception as e:
+                        self.error = e  # дальше только опустошаем очередь, чтобы не блокировать симуляцию
+            finally:
+                tasks.task_done()
+
+    def submit(self, board, step: int) -> None:
+        """
+        Ставит поколение в очереди вывода.
+
+        :param board: поле любого движка
+        :param step: int, номер поколения
+        :return: None
+        :raises Exception: ошибка, возникшая ранее в одном из потоков вывода
+        """
+        if self.error is not None:
+            raise self.error
+
+        snapshot = exact_ages(board).copy()  # возраст движка python не ограничивается, как и без конвейера
+        snapshot.flags.writeable = False
+        for tasks in self.queues:
+            tasks.put((snapshot, step))
+
+    def drain(self) -> None:
+        """
+        Дожидается вывода всех поставленных поколений, не останавливая потоки.
+
+        :return: None
+        :raises Exception: ошибка, возникшая в одном из потоков вывода
+        """
+        for tasks in self.queues:
+            tasks.join()
+        if self.error is not None:
+            raise self.error
+
+    def close(self) -> None:
+        """
+        Дожидается вывода всех поколений и останавливает потоки.
+
+        :return: None
+        :raises Exception: ошибка, возникшая в одном из потоков вывода
+        """
+        for tasks in self.queues:
+            tasks.put(self._STOP)
+        for thread in self.threads:
+            thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+CHECKPOINT_VERSION = 1
+
+# Параметры, которые должны совпадать при продолжении прогона с контрольной точки:
+# от них зависят уже записанные файл поколений и GIF
+CHECKPOINT_FIELDS = (
+    'output_file', 'output_format', 'compression', 'rule', 'render', 'gif_name',
+    'gif_duration', 'cell_size', 'border_color', 'background_color', 'base_color', 'age_colors',
+)
+
+
+def checkpoint_path(config: Config) -> str:
+    """
+    Возвращает имя файла контрольной точки.
+
+    :param config: Config, параметры конфигурации
+    :return: str, config.checkpoint_file или имя файла поколений с суффиксом '.ckpt'
+    """
+    return config.checkpoint_file or config.output_file + '.ckpt'
+
+
+def _checkpoint_config(config: Config) -> dict:
+    return json.loads(json.dumps({field: getattr(config, field) for field in CHECKPOINT_FIELDS}))
+
+
+def write_checkpoint(filename: str, board, step: int, config: Config,
+                     steps_offset: int, gif_state: Tuple[int, int] = None) -> None:
+    """
+    Атомарно сохраняет контрольную точку прогона.
+
+    Поле с возрастами (без ограничения сверху, см. exact_ages) и описание
+    прогона (JSON) пишутся в сжатый архив .npz во временный файл рядом
+    с целевым, который затем заменяет прежнюю точку одной операцией
+    os.replace: прерванная запись не портит предыдущую точку.
+
+    :param filename: str, имя файла контрольной точки
+    :param board: поле любого движка после поколения step
+    :param step: int, номер поколения, уже записанного в выходные файлы
+    :param config: Config, параметры конфигурации
+    :param steps_offset: int, длина файла поколений после поколения step
+    :param gif_state: (int, int), длина GIF и число кадров; None — GIF не пишется
+    :return: None
+    :raises OSError: если произошла ошибка при записи файла
+    """
+    meta = {
+        'version': CHECKPOINT_VERSION,
+        'step': step,
+        'config': _checkpoint_config(config),
+        'steps_offset': steps_offset,
+        'gif_offset': gif_state[0] if gif_state else None,
+        'gif_frames': gif_state[1] if gif_state else 0,
+    }
+    temp = f'{filename}.{os.getpid()}.tmp'
+    try:
+        with open(temp, 'wb') as f:
+            np.savez_compressed(
+                f, ages=exact_ages(board),
+                meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+            )
+        os.replace(temp, filename)
+    except OSError as e:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise OSError(f'Ошибка записи контрольной точки "{filename}": {e}')
+
+
+def read_checkpoint(filename: str) -> dict:
+    """
+    Читает контрольную точку, сохранённую write_checkpoint.
+
+    :param filename: str, имя файла контрольной точки
+    :return: dict, описание прогона; поле с возрастами — под ключом 'ages'
+    :raises FileNotFoundError: если файл не найден
+    :raises ValueError: если файл не является контрольной точкой этой версии
+    """
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f'Контрольная точка "{filename}" не найдена')
+    try:
+        with np.load(filename, allow_pickle=False) as data:
+            checkpoint = json.loads(data['meta'].tobytes())
+            checkpoint['ages'] = data['ages']
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        raise ValueError(f'Файл "{filename}" не является контрольной точкой: {e}')
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f'Неподдерживаемая версия контрольной точки "{filename}"')
+    return checkpoint
+
+
+def check_checkpoint(checkpoint: dict, config: Config) -> None:
+    """
+    Проверяет, что прогон можно продолжить с контрольной точки с текущими параметрами.
+
+    :param checkpoint: dict, результат read_checkpoint
+    :param config: Config, параметры конфигурации
+    :return: None
+    :raises ValueError: если параметры вывода отличаются от сохранённых
+                        или поколений меньше, чем уже записано
+    """
+    saved = checkpoint['config']
+    for field, value in _checkpoint_config(config).items():
+        if saved.get(field) != value:
+            raise ValueError(
+                f'Параметр {field} = {value!r} не совпадает с контрольной точкой ({saved.get(field)!r})'
+            )
+    if config.generations < checkpoint['step']:
+        raise ValueError(
+            f'Контрольная точка сохранена после поколения {checkpoint["step"]}, '
+            f'а запрошено {config.generations}'
+        )
+
+
+def run_simulation(engine: Engine, config: Config, metrics=NULL_METRICS, resume: dict = None):
+    """
+    Прогоняет движок на config.generations поколений,
+    записывая каждое поколение в файл поколений и, если включена
+    отрисовка (config.render), в GIF-анимацию.
+
+    Если включено обнаружение циклов (config.cycle_mode), при повторении поля
+    прогон останавливается ('stop') или итоговое поколение вычисляется
+    экстраполяцией без расчёта оставшихся поколений ('skip').
+
+    Если задан config.checkpoint_every, каждые столько поколений и в конце
+    прогона сохраняется контрольная точка (см. write_checkpoint). При
+    продолжении (resume) движок должен быть создан из поля контрольной точки:
+    выходные файлы обрезаются до сохранённых смещений, и вывод продолжается
+    со следующего поколения. Обнаружение циклов начинается заново.
+
+    :param engine: Engine, движок расчёта поколений
+    :param config: Config, параметры конфигурации
+    :param metrics: RunMetrics, метрики этапов (по умолчанию выключены)
+    :param resume: dict, контрольная точка (read_checkpoint), с которой продолжается прогон
+    :return: tuple (start, period) обнаруженного цикла или None
+    :raises ValueError: если контрольные точки запрошены для движка hashlife
+    """
+    if isinstance(engine, HashLifeEngine) and (config.checkpoint_every or resume):
+        raise ValueError('Движок hashlife не поддерживает контрольные точки')
+
+    first = resume['step'] if resume else 0
+    writer = StepWriter(config.output_file, config.output_format, config.compression,
+                        format_rule(parse_rule(config.rule)),
+                        offset=resume['steps_offset'] if resume else None)
+    if resume:
+        writer.restore(resume['ages'], first)
+    gif = renderer = None
+    if config.render:
+        gif = GifWriter(config.gif_name, frame_palette(config), config.gif_duration,
+                        offset=resume['gif_offset'] if resume else None,
+                        frames=resume['gif_frames'] if resume else 0)
+        renderer = FrameRenderer(config)
+        if resume:
+            renderer.render(resume['ages'])  # следующий кадр — изменения относительно точки
+    pipeline = OutputPipeline(config, writer, gif, metrics, renderer) if config.pipeline else None
+
+    def emit(board, step: int) -> None:
+        if metrics.enabled:
+            metrics.count(step, 'live_cells', int(alive_mask(board).sum()))
+        if pipeline is not None:
+            start = metrics.clock()
+            pipeline.submit(board, step)
+            metrics.add(step, 'submit', start)
+        else:
+            write_generation(board, step, config, writer, gif, metrics, renderer)
+
+    def snapshot(step: int):
+        start = metrics.clock()
+        board = engine.snapshot()
+        metrics.add(step, 'snapshot', start)
+        return board
+
+    def advance(step: int, steps: int = 1) -> None:
+        start = metrics.clock()
+        if steps == 1:
+            engine.step()
+        else:
+            engine.advance(steps)
+        metrics.add(step, 'step', start)
+
+    def save(board, step: int) -> None:
+        start = metrics.clock()
+        if pipeline is not None:
+            pipeline.drain()
+        write_checkpoint(checkpoint_path(config), board, step, config,
+                         writer.checkpoint(), gif.checkpoint() if gif is not None else None)
+        metrics.add(step, 'checkpoint', start)
+
+    try:
+        if isinstance(engine, HashLifeEngine):
+            # HashLife пропускает промежуточные поколения: выводим только начальное и итоговое
+            emit(snapshot(0), 0)
+            if config.generations > 0:
+                advance(config.generations, config.generations)
+                emit(snapshot(config.generations), config.generations)
+            return None
+
+        detector = CycleDetector() if config.cycle_mode != 'off' else None
+
+        for step in range(first, config.generations + 1):
+            board = snapshot(step)
+            if step > first or not resume:
+                emit(board, step)
+                if config.checkpoint_every and (step % config.checkpoint_every == 0
+                                                or step == config.generations):
+                    save(board, step)
+
+            start = metrics.clock()
+            cycle = detector.update(board, step) if detector else None
+            metrics.add(step, 'cycles', start)
+            if cycle:
+                start, period = cycle
+                print(f'Обнаружен цикл периода {period}, начиная с поколения {start}')
+
+                if config.cycle_mode == 'skip' and step < config.generations:
+                    cycles, rest = divmod(config.generations - step, period)
+                    for _ in range(rest):
+                        advance(config.generations)
+                    board = extrapolate_ages(as_array(snapshot(config.generations)), period, cycles)
+                    emit(board, config.generations)
+                    if config.checkpoint_every:
+                        save(board, config.generations)
+                return cycle
+
+            if step < config.generations:
+                advance(step + 1)
+        return None
+    finally:
+        try:
+            if pipeline is not None:
+                pipeline.close()
+        finally:
+            writer.close()
+            if gif is not None:
+                gif.close()
+
+
+BATCH_COLUMNS = ('seed', 'population', 'period', 'lifespan', 'generations', 'error')
+
+
+def find_seeds(pattern: str) -> List[str]:
+    """
+    Находит файлы начальных полей для пакетного режима.
+
+    :param pattern: str, каталог (берутся все файлы в нём) или шаблон glob
+    :return: list, отсортированные пути к файлам
+    :raises FileNotFoundError: если не найдено ни одного файла
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*')
+    seeds = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    if not seeds:
+        raise FileNotFoundError(f'Не найдено ни одного файла поля по шаблону "{pattern}"')
+    return seeds
+
+
+def run_seed(filename: str, config: Config) -> dict:
+    """
+    Прогоняет одно поле без вывода и возвращает итог.
+
+    Повторение поля отслеживается CycleDetector: как только оно найдено,
+    расчёт останавливается, а население в поколении config.generations
+    берётся из цикла.
+
+    :param filename: str, файл начального поля
+    :param config: Config, параметры конфигурации
+    :return: dict, итог с полями BATCH_COLUMNS: population — население в последнем
+             поколении, period — период цикла, lifespan — поколение, с которого поле
+             повторяется (для вымершего поля — поколение вымирания), generations —
+             число рассчитанных поколений, error — текст ошибки чтения
+    """
+    result = dict.fromkeys(BATCH_COLUMNS)
+    result.update(seed=filename, generations=0, error='')
+    try:
+        engine = create_engine(read_board(filename, packed=config.engine == 'bitpacked'), config)
+    except (OSError, ValueError) as e:
+        result['error'] = str(e)
+        return result
+
+    try:
+        if isinstance(engine, HashLifeEngine):
+            engine.advance(config.generations)
+            result.update(population=int(alive_mask(engine.snapshot()).sum()),
+                          generations=config.generations)
+            return result
+
+        detector = CycleDetector()
+        populations = []
+        for step in range(config.generations + 1):
+            board = engine.snapshot()
+            populations.append(int(alive_mask(board).sum()))
+
+            cycle = detector.update(board, step)
+            if cycle:
+                start, period = cycle
+                result.update(population=populations[start + (config.generations - start) % period],
+                              period=period, lifespan=start, generations=step)
+                return result
+
+            if step < config.generations:
+                engine.step()
+
+        result.update(population=populations[-1], generations=config.generations)
+        return result
+    finally:
+        engine.close()
+
+
+def run_batch(seeds: List[str], config: Config, chunksize: int = 0) -> List[dict]:
+    """
+    Прогоняет поля в пуле из config.workers процессов.
+
+    Поля раздаются процессам пачками по chunksize, чтобы не платить
+    за передачу каждого поля отдельно.
+
+    :param seeds: list, файлы начальных полей
+    :param config: Config, параметры конфигурации
+    :param chunksize: int, полей в пачке (0 — подобрать по числу полей и процессов)
+    :return: list, итоги run_seed в порядке seeds
+    """
+    workers = max(1, min(config.workers, len(seeds)))
+    if workers == 1:
+        return [run_seed(seed, config) for seed in seeds]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = chunksize or max(1, len(seeds) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_seed, seeds, repeat(config), chunksize=chunksize))
+
+
+def write_batch_results(results: List[dict], filename: str) -> None:
+    """
+    Записывает итоги пакетного прогона в CSV-таблицу.
+
+    :param results: list, итоги run_seed
+    :param filename: str, файл таблицы
+    :return: None
+    :raises OSError: если произошла ошибка при записи файла
+    """
+    try:
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            table = csv.DictWriter(f, fieldnames=BATCH_COLUMNS)
+            table.writeheader()
+            table.writerows(results)
+    except OSError as e:
+        raise OSError(f'Ошибка записи в файл "{filename}": {e}')
+
+
+def run_batch_main(config: Config, chunksize: int = 0) -> None:
+    """
+    Пакетный режим: config.input_file — каталог или шаблон полей,
+    config.output_file — таблица итогов.
+
+    :param config: Config, параметры конфигурации
+    :param chunksize: int, полей в пачке
+    :return: None
+    """
+    seeds = find_seeds(config.input_file)
+
+    start = time.perf_counter()
+    results = run_batch(seeds, config, chunksize)
+    elapsed = time.perf_counter() - start
+
+    write_batch_results(results, config.output_file)
+    errors = sum(1 for result in results if result['error'])
+    print(f'Обработано полей: {len(results)} (с ошибками: {errors}) за {elapsed:.2f} с, '
+          f'{len(results) / elapsed:.1f} полей/с')
+
+
+def main():
+    """
+    Запуск программы
+
+    :return: None
+    """
+    try:
+        args = parse_args()
+
+        config = Config(
+            input_file=args.input_file,
+            output_file=args.output_file,
+            generations=args.steps,
+            engine=args.engine,
+            workers=args.workers,
+            hashlife_cache_size=args.hashlife_cache,
+            age_colors=not args.no_age_colors,
+            cycle_mode=args.cycles,
+            save_png=args.png,
+            pipeline=args.pipeline,
+            output_format=args.format,
+            compression=args.compress,
+            metrics_file=args.metrics,
+            rule=args.rule,
+            render=not args.no_render,
+            checkpoint_every=args.checkpoint_every,
+            checkpoint_file=args.checkpoint
+        )
 
-        make_gif(config)
-        print('GIF успешно создан')
+        if args.batch:
+            run_batch_main(config, args.chunksize)
+            return
+
+        metrics = RunMetrics() if config.metrics_file else NULL_METRICS
+
+        resume = None
+        start = metrics.clock()
+        if args.resume:
+            resume = read_checkpoint(checkpoint_path(config))
+            check_checkpoint(resume, config)
+            grid = resume['ages']
+            print(f'Продолжение с поколения {resume["step"]}')
+        else:
+            grid = read_board(config.input_file, packed=config.engine == 'bitpacked')
+        metrics.add_setup('read', start)
+
+        start = metrics.clock()
+        engine = create_engine(grid, config)
+        metrics.add_setup('engine', start)
+        try:
+            run_simulation(engine, config, metrics, resume)
+        finally:
+            engine.close()
+
+        if config.render:
+            print('GIF успешно создан')
+        else:
+            print(f'Поколения записаны в "{config.output_file}"')
+
+        if metrics.enabled:
+            metrics.print_summary(metrics.write(config.metrics_file))
 
     except Exception as e:
         print(f'Ошибка выполнения программы: {e}')
@@ -1,11 +1,60 @@
+import os
+import random
+import subprocess
+import sys
+import tempfile
 import unittest
 
+from PIL import Image, ImageDraw
+
 from project_life.life_from_class import (
     read_input,
+    read_board,
     age_color,
+    next_generation,
+    next_generation_numpy,
+    next_generation_sparse,
+    grid_to_cells,
+    cells_to_array,
+    HashLifeEngine,
+    ParallelEngine,
+    BitBoard,
+    CycleDetector,
+    extrapolate_ages,
+    render_frame,
+    frame_palette,
+    render_indices,
+    FrameRenderer,
+    GifWriter,
+    run_simulation,
+    run_seed,
+    run_batch,
+    find_seeds,
+    RunMetrics,
+    write_output,
+    format_rle_step,
+    StepWriter,
+    read_delta_steps,
+    open_step_log,
+    AGE_COLOR_LIMIT,
+    grid_to_array,
+    as_array,
+    create_engine,
+    parse_rule,
+    format_rule,
+    read_checkpoint,
+    check_checkpoint,
+    NumpyEngine,
+    PythonEngine,
     Config,
 )
 
+
+def random_grid(rows, cols, seed, density=0.35):
+    rnd = random.Random(seed)
+    return [[1 if rnd.random() < density else 0 for _ in range(cols)]
+            for _ in range(rows)]
+
 class TestConfig(unittest.TestCase):
     def test_default_config(self):
         config = Config()
@@ -39,6 +88,32 @@ class TestReadInput(unittest.TestCase):
 
         self.assertNotEqual(grid, expected)
 
+    def test_read_board_matches_read_input(self):
+        board = read_board('data/test_life_input.txt')
+
+        self.assertEqual(board.dtype.itemsize, 1)
+        self.assertEqual(board.tolist(), read_input('data/test_life_input.txt'))
+
+    def test_read_rle(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'glider.rle')
+            with open(filename, 'w') as f:
+                f.write('#N Glider\nx = 4, y = 4, rule = B3/S23\nbo$2bo$3o\n$!\n')
+
+            self.assertEqual(read_input(filename),
+                             [[0, 1, 0, 0], [0, 0, 1, 0], [1, 1, 1, 0], [0, 0, 0, 0]])
+            self.assertEqual(read_input(filename, packed=True).to_array().tolist(),
+                             read_input(filename))
+
+    def test_rle_errors_report_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'bad.rle')
+            for body, message in (('3o$\n4o!', 'строки 4'), ('3o$\n2q!', 'строке 4')):
+                with open(filename, 'w') as f:
+                    f.write('#C\nx = 3, y = 2\n' + body)
+                with self.assertRaisesRegex(ValueError, message):
+                    read_board(filename)
+
     def test_file_not_found(self):
         with self.assertRaises(FileNotFoundError):
             read_input('no_such_file.txt')
@@ -53,3 +128,582 @@ class TestAgeColor(unittest.TestCase):
         self.assertTrue(old[0] >= young[0])
         self.assertTrue(old[1] >= young[1])
         self.assertTrue(old[2] >= young[2])
+
+class TestNumpyEngine(unittest.TestCase):
+    def test_blinker(self):
+        grid = [
+            [0, 0, 0],
+            [1, 1, 1],
+            [0, 0, 0]
+        ]
+
+        result = next_generation_numpy(grid_to_array(grid))
+
+        self.assertEqual(result.tolist(), [[0, 1, 0], [0, 2, 0], [0, 1, 0]])
+
+    def test_matches_reference(self):
+        grid = random_grid(30, 41, seed=1)
+        ages = grid_to_array(grid)
+
+        for _ in range(20):
+            grid = next_generation(grid)
+            ages = next_generation_numpy(ages)
+            self.assertEqual(ages.tolist(), grid)
+
+    def test_create_engine(self):
+        grid = random_grid(12, 12, seed=2)
+        engine = create_engine(grid, Config(engine='numpy'))
+        engine.step()
+
+        self.assertEqual(engine.snapshot().tolist(), next_generation(grid))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            create_engine([[0]], Config(engine='no_such_engine'))
+
+
+class TestSparseEngine(unittest.TestCase):
+    def test_matches_reference(self):
+        grid = random_grid(25, 17, seed=3, density=0.15)
+        cells = grid_to_cells(grid)
+
+        for _ in range(20):
+            grid = next_generation(grid)
+            cells = next_generation_sparse(cells, 25, 17)
+            self.assertEqual(cells_to_array(cells, 25, 17).tolist(), grid)
+
+    def test_empty_board(self):
+        engine = create_engine([[0, 0], [0, 0]], Config(engine='sparse'))
+        engine.step()
+
+        self.assertEqual(engine.snapshot().tolist(), [[0, 0], [0, 0]])
+
+
+class TestHashLifeEngine(unittest.TestCase):
+    def test_matches_reference_away_from_border(self):
+        grid = [[0] * 96 for _ in range(96)]
+        soup = random_grid(8, 8, seed=4, density=0.5)
+        for r in range(8):
+            grid[44 + r][44:52] = soup[r]
+
+        expected = grid
+        for _ in range(40):
+            expected = next_generation(expected)
+
+        engine = HashLifeEngine(grid, Config())
+        engine.advance(40)
+        result = engine.snapshot().tolist()
+
+        for r in range(96):
+            for c in range(96):
+                self.assertEqual(result[r][c] > 0, expected[r][c] > 0)
+                self.assertEqual(min(result[r][c], AGE_COLOR_LIMIT),
+                                 min(expected[r][c], AGE_COLOR_LIMIT))
+
+    def test_long_run_with_small_cache(self):
+        grid = [[0] * 16 for _ in range(16)]
+        grid[8][7:10] = [1, 1, 1]
+
+        engine = HashLifeEngine(grid, Config(hashlife_cache_size=64))
+        engine.advance(10 ** 6 + 1)
+        alive = [(r, c) for r, row in enumerate(engine.snapshot().tolist())
+                 for c, age in enumerate(row) if age]
+
+        self.assertEqual(alive, [(7, 8), (8, 8), (9, 8)])
+
+
+class TestParallelEngine(unittest.TestCase):
+    def test_matches_reference(self):
+        grid = random_grid(23, 19, seed=6)
+        engine = ParallelEngine(grid, Config(workers=3))
+
+        try:
+            for _ in range(10):
+                grid = next_generation(grid)
+                engine.step()
+                self.assertEqual(engine.snapshot().tolist(), grid)
+        finally:
+            engine.close()
+
+
+class TestBitBoard(unittest.TestCase):
+    def test_matches_reference(self):
+        for cols in (7, 64, 70):
+            grid = random_grid(20, cols, seed=cols)
+            board = BitBoard.from_array(grid_to_array(grid))
+
+            for _ in range(15):
+                grid = next_generation(grid)
+                board = board.next_generation()
+                self.assertEqual(board.to_array().tolist(), grid)
+
+    def test_without_ages(self):
+        grid = random_grid(10, 10, seed=7)
+        board = BitBoard.from_array(grid_to_array(grid), track_ages=False)
+        board = board.next_generation().next_generation()
+
+        expected = next_generation(next_generation(grid))
+        self.assertIsNone(board.ages)
+        self.assertEqual(board.alive().tolist(),
+                         [[int(age > 0) for age in row] for row in expected])
+
+    def test_read_packed_input(self):
+        board = read_input('data/test_life_input.txt', packed=True)
+
+        self.assertEqual(board.shape, (4, 5))
+        self.assertEqual(board.to_array().tolist(), read_input('data/test_life_input.txt'))
+
+
+class TestCycleDetection(unittest.TestCase):
+    def test_blinker_period(self):
+        grid = [
+            [0, 0, 0],
+            [1, 1, 1],
+            [0, 0, 0]
+        ]
+        detector = CycleDetector()
+
+        results = []
+        for step in range(3):
+            results.append(detector.update(grid, step))
+            grid = next_generation(grid)
+
+        self.assertEqual(results, [None, None, (0, 2)])
+
+    def test_extrapolation_matches_reference(self):
+        grid = random_grid(12, 12, seed=8)
+        generations = 500
+
+        detector = CycleDetector()
+        step, cycle = 0, detector.update(grid, 0)
+        while cycle is None:
+            grid = next_generation(grid)
+            step += 1
+            cycle = detector.update(grid, step)
+        start, period = cycle
+
+        expected = grid
+        for _ in range(generations - step):
+            expected = next_generation(expected)
+
+        cycles, rest = divmod(generations - step, period)
+        current = grid
+        for _ in range(rest):
+            current = next_generation(current)
+
+        result = extrapolate_ages(grid_to_array(current), period, cycles)
+        self.assertEqual(result.tolist(), expected)
+
+
+class TestGifWriter(unittest.TestCase):
+    def test_frames_match_rendered_images(self):
+        config = Config(cell_size=4)
+        grid = random_grid(6, 8, seed=9)
+        frames = []
+        for _ in range(4):
+            grid = next_generation(grid)
+            frames.append(render_frame(grid, config))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'life.gif')
+            gif = GifWriter(filename, frame_palette(config), duration=100)
+            for frame in frames:
+                gif.append(frame)
+            gif.close()
+
+            with Image.open(filename) as image:
+                self.assertEqual(image.n_frames, len(frames))
+                for i, frame in enumerate(frames):
+                    image.seek(i)
+                    self.assertEqual(image.convert('RGB').tobytes(), frame.tobytes())
+
+
+class TestFrameRenderer(unittest.TestCase):
+    def test_incremental_matches_full_render(self):
+        config = Config(cell_size=3)
+        renderer = FrameRenderer(config)
+        grid = random_grid(12, 16, seed=4)
+        for _ in range(12):
+            pixels, _ = renderer.render(grid)
+            self.assertEqual(pixels.tolist(), render_indices(grid, config).tolist())
+            grid = next_generation(grid)
+
+    def test_partial_gif_frames(self):
+        glider = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+        grid = [[0] * 100 for _ in range(100)]
+        for r in range(3):
+            grid[r + 1][1:4] = glider[r]
+        grid[80][80:82] = grid[81][80:82] = [1, 1]  # блок: стареет, пока не перестанет менять цвет
+        with tempfile.TemporaryDirectory() as tmp:
+            sizes = {}
+            for name, renderer in (('full', None), ('partial', FrameRenderer(Config(cell_size=4)))):
+                config = Config(cell_size=4)
+                filename = os.path.join(tmp, name + '.gif')
+                gif = GifWriter(filename, frame_palette(config), duration=100)
+                frames, board = [], grid
+                for _ in range(20):
+                    frames.append(render_frame(board, config))
+                    if renderer is None:
+                        gif.append_indices(render_indices(board, config))
+                    else:
+                        indices, update = renderer.render(board)
+                        gif.append_indices(indices) if update is None else gif.append_patch(*update)
+                    board = next_generation(board)
+                gif.close()
+                sizes[name] = os.path.getsize(filename)
+
+                with Image.open(filename) as image:
+                    self.assertEqual(image.n_frames, len(frames))
+                    for i, frame in enumerate(frames):
+                        image.seek(i)
+                        self.assertEqual(image.convert('RGB').tobytes(), frame.tobytes(), (name, i))
+
+        self.assertLess(sizes['partial'], sizes['full'] / 3)
+
+
+def draw_reference_frame(grid, config):
+    """Отрисовка по прямоугольникам ImageDraw, как до векторизации."""
+    size = config.cell_size
+    img = Image.new('RGB', (len(grid[0]) * size, len(grid) * size), config.background_color)
+    draw = ImageDraw.Draw(img)
+    for r, row in enumerate(grid):
+        for c, age in enumerate(row):
+            box = [c * size, r * size, c * size + size, r * size + size]
+            if age > 0:
+                draw.rectangle(box, fill=age_color(age, config.base_color))
+            draw.rectangle(box, outline=config.border_color)
+    return img
+
+
+class TestRenderFrame(unittest.TestCase):
+    def test_pixel_identical_to_reference(self):
+        rnd = random.Random(10)
+        grid = [[rnd.choice([0, 0, 1, 2, 7, 13, 20]) for _ in range(9)] for _ in range(7)]
+
+        for size in (1, 3, 20):
+            config = Config(cell_size=size)
+            self.assertEqual(render_frame(grid, config).tobytes(),
+                             draw_reference_frame(grid, config).tobytes())
+
+
+class TestPipeline(unittest.TestCase):
+    def run_to_files(self, tmp, name, grid=None, **options):
+        options.setdefault('engine', 'numpy')
+        config = Config(
+            output_file=os.path.join(tmp, name + '.txt'),
+            gif_name=os.path.join(tmp, name + '.gif'),
+            generations=8,
+            cell_size=3,
+            **options
+        )
+        engine = create_engine(grid or random_grid(15, 15, seed=11), config)
+        run_simulation(engine, config)
+
+        with open(config.output_file, 'rb') as text, open(config.gif_name, 'rb') as gif:
+            return text.read(), gif.read()
+
+    def test_same_output_as_sequential(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sequential = self.run_to_files(tmp, 'sequential')
+            pipelined = self.run_to_files(tmp, 'pipelined', pipeline=True, queue_size=1)
+
+        self.assertEqual(pipelined, sequential)
+
+    def test_python_engine_old_ages(self):
+        grid = [[0, 0, 0, 0], [0, 69998, 69998, 0], [0, 69998, 69998, 0], [0, 0, 0, 0]]
+        for output_format in ('text', 'delta'):
+            with tempfile.TemporaryDirectory() as tmp:
+                options = dict(engine='python', output_format=output_format)
+                sequential = self.run_to_files(tmp, 'sequential', grid, **options)
+                pipelined = self.run_to_files(tmp, 'pipelined', grid, pipeline=True, queue_size=1, **options)
+
+            self.assertEqual(pipelined, sequential)
+            if output_format == 'text':
+                self.assertIn(b'0;70006;70006;0', pipelined[0])
+
+
+def write_reference_output(grid, filename, step):
+    """Запись поколения построчно, как до StepWriter."""
+    with open(filename, 'a', encoding='utf-8') as f:
+        f.write(f'--- Step {step} ---\n')
+        for row in grid:
+            f.write(';'.join(map(str, row)) + '\n')
+
+
+class TestStepWriter(unittest.TestCase):
+    def test_python_engine_ages_are_not_clamped(self):
+        grid = [[70000, 0, 1], [3, 65536, 12]]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            expected = os.path.join(tmp, 'expected.txt')
+            actual = os.path.join(tmp, 'actual.txt')
+            streamed = os.path.join(tmp, 'streamed.txt')
+            write_reference_output(grid, expected, 5)
+            write_output(grid, actual, 5)
+            writer = StepWriter(streamed)
+            writer.write(grid, 5)
+            writer.close()
+
+            with open(expected, 'rb') as a, open(actual, 'rb') as b, open(streamed, 'rb') as c:
+                reference = a.read()
+                self.assertIn(b'70000;0;1', reference)
+                self.assertEqual(b.read(), reference)
+                self.assertEqual(c.read(), reference)
+
+    def test_text_matches_write_output(self):
+        boards = [grid_to_array(random_grid(6, 8, seed)) for seed in range(3)]
+        boards[1][2, 3] = 12
+
+        with tempfile.TemporaryDirectory() as tmp:
+            expected = os.path.join(tmp, 'expected.txt')
+            actual = os.path.join(tmp, 'actual.txt')
+            writer = StepWriter(actual)
+            for step, board in enumerate(boards):
+                write_output(board, expected, step)
+                writer.write(board, step)
+            writer.close()
+
+            with open(expected, 'rb') as a, open(actual, 'rb') as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_rle_glider(self):
+        glider = grid_to_array([[0, 1, 0], [0, 0, 1], [1, 1, 1]])
+        self.assertEqual(format_rle_step(glider, 4),
+                         b'#C Step 4\nx = 3, y = 3, rule = B3/S23\nbo$2bo$3o!\n')
+
+    def test_delta_round_trip(self):
+        engine = create_engine(random_grid(12, 12, seed=5), Config(engine='numpy'))
+        expected = []
+        for step in range(6):
+            expected.append((step, engine.snapshot().copy()))
+            engine.step()
+        expected.append((10, expected[-1][1]))  # пропуск поколений -> полная запись
+
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'steps.delta')
+            writer = StepWriter(filename, 'delta', 'gzip')
+            for step, board in expected:
+                writer.write(board, step)
+            writer.close()
+
+            restored = list(read_delta_steps(filename))
+
+        self.assertEqual([step for step, _ in restored], [step for step, _ in expected])
+        for (_, ages), (_, board) in zip(restored, expected):
+            self.assertTrue((ages == board).all())
+
+
+class TestRunMetrics(unittest.TestCase):
+    def test_records_stages_and_counters(self):
+        metrics = RunMetrics()
+        with tempfile.TemporaryDirectory() as tmp:
+            config = Config(
+                output_file=os.path.join(tmp, 'out.txt'),
+                gif_name=os.path.join(tmp, 'life.gif'),
+                generations=3,
+                cell_size=2,
+                engine='numpy',
+            )
+            grid = [[0, 0, 0], [1, 1, 1], [0, 0, 0]]
+            run_simulation(create_engine(grid, config), config, metrics)
+            report = metrics.write(os.path.join(tmp, 'metrics.json'))
+            text_size = os.path.getsize(config.output_file)
+
+        self.assertEqual(report['stages']['step']['calls'], 3)
+        self.assertEqual(report['stages']['text']['calls'], 4)
+        self.assertEqual([g['live_cells'] for g in report['generations']], [3, 3, 3, 3])
+        self.assertEqual(report['counters']['text_bytes']['total'], text_size)
+        self.assertGreater(report['counters']['frame_bytes']['max'], 0)
+
+
+class TestBatch(unittest.TestCase):
+    def write_seed(self, tmp, name, rows):
+        filename = os.path.join(tmp, name)
+        with open(filename, 'w') as f:
+            f.write('\n'.join(rows))
+        return filename
+
+    def test_run_seed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            blinker = self.write_seed(tmp, 'blinker.txt', ['.....', '.XXX.', '.....'])
+            dying = self.write_seed(tmp, 'dying.txt', ['X..', '...', '..X'])
+            broken = self.write_seed(tmp, 'broken.txt', ['X?'])
+            config = Config(engine='numpy', generations=101)
+
+            result = run_seed(blinker, config)
+            self.assertEqual((result['population'], result['period'], result['lifespan']), (3, 2, 0))
+            self.assertEqual(result['generations'], 2)
+
+            result = run_seed(dying, config)
+            self.assertEqual((result['population'], result['period'], result['lifespan']), (0, 1, 1))
+
+            self.assertIn('строке 1', run_seed(broken, config)['error'])
+
+    def test_pool_matches_sequential(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for seed in range(6):
+                grid = random_grid(12, 12, seed=seed)
+                self.write_seed(tmp, f'seed_{seed}.txt',
+                                [''.join('X' if cell else '.' for cell in row) for row in grid])
+
+            seeds = find_seeds(tmp)
+            sequential = run_batch(seeds, Config(engine='numpy', generations=60, workers=1))
+            pooled = run_batch(seeds, Config(engine='numpy', generations=60, workers=2), chunksize=2)
+
+        self.assertEqual(len(seeds), 6)
+        self.assertEqual(pooled, sequential)
+
+
+class TestRules(unittest.TestCase):
+    def test_parse_rule(self):
+        table = parse_rule('B36/S23')
+
+        self.assertEqual(table[0].nonzero()[0].tolist(), [3, 6])
+        self.assertEqual(table[1].nonzero()[0].tolist(), [2, 3])
+        self.assertEqual(format_rule(parse_rule('s23/b36')), 'B36/S23')
+        self.assertEqual(format_rule(parse_rule('23/3')), 'B3/S23')
+        self.assertEqual(format_rule(parse_rule('B2/S')), 'B2/S')
+        with self.assertRaises(ValueError):
+            parse_rule('B9/S23')
+
+    def test_engines_match_reference(self):
+        for rule in ('B36/S23', 'B2/S', 'B3/S012345678', 'B0/S8'):
+            table = parse_rule(rule)
+            for name in ('numpy', 'sparse', 'bitpacked'):
+                if name == 'sparse' and table[0][0]:
+                    with self.assertRaises(ValueError):
+                        create_engine([[0]], Config(engine=name, rule=rule))
+                    continue
+
+                grid = random_grid(14, 70, seed=9)
+                engine = create_engine(grid, Config(engine=name, rule=rule))
+                for _ in range(8):
+                    grid = next_generation(grid, table)
+                    engine.step()
+                    self.assertEqual(as_array(engine.snapshot()).tolist(), grid, (rule, name))
+
+
+class Crashing:
+    """Примесь к движку: «падает» после заданного числа шагов."""
+
+    def __init__(self, grid, config, crash_after):
+        super().__init__(grid, config)
+        self.steps_left = crash_after
+
+    def step(self):
+        if self.steps_left == 0:
+            raise RuntimeError('crash')
+        self.steps_left -= 1
+        super().step()
+
+
+class CrashingEngine(Crashing, NumpyEngine):
+    pass
+
+
+class CrashingPythonEngine(Crashing, PythonEngine):
+    pass
+
+
+class TestNoRender(unittest.TestCase):
+    def run_text(self, tmp, name, **options):
+        config = Config(
+            output_file=os.path.join(tmp, name + '.txt'),
+            gif_name=os.path.join(tmp, name + '.gif'),
+            generations=8,
+            cell_size=3,
+            engine='numpy',
+            **options
+        )
+        run_simulation(create_engine(random_grid(15, 15, seed=11), config), config)
+
+        with open(config.output_file, 'rb') as f:
+            return f.read(), os.path.exists(config.gif_name)
+
+    def test_same_text_without_gif(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            rendered, rendered_gif = self.run_text(tmp, 'rendered')
+            text_only, text_only_gif = self.run_text(tmp, 'text_only', render=False)
+
+        self.assertEqual(text_only, rendered)
+        self.assertTrue(rendered_gif)
+        self.assertFalse(text_only_gif)
+
+    def test_pillow_not_imported_on_load(self):
+        code = 'import sys, project_life.life_from_class; print("PIL" in sys.modules)'
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        output = subprocess.run([sys.executable, '-c', code], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), 'False')
+
+
+class TestCheckpoint(unittest.TestCase):
+    def make_config(self, tmp, name, **options):
+        options.setdefault('generations', 20)
+        options.setdefault('engine', 'numpy')
+        return Config(
+            output_file=os.path.join(tmp, name + '.out'),
+            gif_name=os.path.join(tmp, name + '.gif'),
+            cell_size=3,
+            **options
+        )
+
+    def read_outputs(self, config):
+        if config.output_format == 'delta':
+            steps = [(step, ages.tolist()) for step, ages in read_delta_steps(config.output_file)]
+        else:
+            with open_step_log(config.output_file) as f:
+                steps = f.read()
+        with open(config.gif_name, 'rb') as f:
+            return steps, f.read()
+
+    def check_resume(self, grid=None, crashing=CrashingEngine, **options):
+        grid = grid or random_grid(15, 15, seed=5)
+        with tempfile.TemporaryDirectory() as tmp:
+            config = self.make_config(tmp, 'full', **options)
+            run_simulation(create_engine(grid, config), config)
+            expected = self.read_outputs(config)
+
+            config = self.make_config(tmp, 'resumed', checkpoint_every=5, **options)
+            with self.assertRaises(RuntimeError):
+                run_simulation(crashing(grid, config, crash_after=13), config)
+
+            checkpoint = read_checkpoint(config.output_file + '.ckpt')
+            self.assertEqual(checkpoint['step'], 10)
+            check_checkpoint(checkpoint, config)
+            run_simulation(create_engine(checkpoint['ages'], config), config, resume=checkpoint)
+
+            self.assertEqual(self.read_outputs(config), expected)
+            self.assertEqual(read_checkpoint(config.output_file + '.ckpt')['step'], 20)
+
+    def test_resume_text(self):
+        self.check_resume()
+
+    def test_resume_compressed_delta(self):
+        self.check_resume(output_format='delta', compression='gzip')
+
+    def test_resume_pipeline(self):
+        self.check_resume(output_format='rle', compression='xz', pipeline=True, queue_size=1)
+
+    def test_resume_python_engine_old_ages(self):
+        # квадрат 2x2 — устойчивая фигура: возраст растёт с каждым поколением
+        grid = [[0, 0, 0, 0], [0, 69990, 69990, 0], [0, 69990, 69990, 0], [0, 0, 0, 0]]
+        self.check_resume(grid, CrashingPythonEngine, engine='python')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            config = self.make_config(tmp, 'run', engine='python', checkpoint_every=5, render=False)
+            run_simulation(create_engine(grid, config), config)
+            self.assertEqual(read_checkpoint(config.output_file + '.ckpt')['ages'][1, 1], 70010)
+            with open(config.output_file) as f:
+                self.assertIn('0;70010;70010;0', f.read())
+
+    def test_mismatched_config(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = self.make_config(tmp, 'run', checkpoint_every=5, render=False)
+            run_simulation(create_engine(random_grid(6, 6, seed=1), config), config)
+            checkpoint = read_checkpoint(config.output_file + '.ckpt')
+
+            with self.assertRaises(ValueError):
+                check_checkpoint(checkpoint, self.make_config(tmp, 'run', rule='B36/S23', render=False))
+            with self.assertRaises(ValueError):
+                check_checkpoint(checkpoint, self.make_config(tmp, 'run', generations=19, render=False))
@@ -0,0 +1,260 @@
+import contextlib
+import io
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+import zip_code_ex6
+from zip_code_ex6 import (
+    zip_data,
+    build_indexes,
+    find_by_zip,
+    find_by_city,
+    find_within_radius,
+    find_nearest,
+    distance_haversine_formula,
+    haversine_vector,
+    haversine_matrix,
+    haversine_chunks,
+    trig_table,
+    distance_vector,
+    distance_matrix,
+    get_zip_data,
+    run_batch,
+    main,
+)
+from utils.spatial_index import SpatialIndex
+
+
+class TestFindByZip(unittest.TestCase):
+
+    def test_known_zip(self):
+        self.assertEqual(find_by_zip('12180'),
+                         ['12180', 42.673701, -73.608792, 'Troy', 'NY', 'Rensselaer'])
+
+    def test_unknown_zip(self):
+        self.assertIsNone(find_by_zip('00000'))
+
+    def test_matches_scan(self):
+        for rec in zip_data[::997]:
+            expected = next(code for code in zip_data if code[0] == rec[0])
+            self.assertEqual(find_by_zip(rec[0]), expected)
+
+
+class TestFindByCity(unittest.TestCase):
+
+    def test_ignores_case(self):
+        zips = find_by_city('TROY', 'ny')
+        self.assertIn('12180', zips)
+        self.assertEqual(zips, find_by_city('troy', 'NY'))
+
+    def test_matches_scan(self):
+        for rec in zip_data[::997]:
+            expected = [data[0] for data in zip_data
+                        if data[3].lower() == rec[3].lower() and data[4].lower() == rec[4].lower()]
+            self.assertEqual(find_by_city(rec[3], rec[4]), expected)
+
+    def test_result_is_a_copy(self):
+        find_by_city('Troy', 'NY').clear()
+        self.assertIn('12180', find_by_city('Troy', 'NY'))
+
+    def test_not_found(self):
+        self.assertEqual(find_by_city('Nowhere', 'NY'), [])
+
+
+class TestBuildIndexes(unittest.TestCase):
+
+    def test_first_record_wins(self):
+        records = [['1', 0.0, 0.0, 'A', 'X', 'C'], ['1', 1.0, 1.0, 'B', 'X', 'C']]
+        zip_index, city_index = build_indexes(records)
+        self.assertIs(zip_index['1'], records[0])
+        self.assertEqual(city_index[('b', 'x')], ['1'])
+
+
+def brute_force(lat, lon):
+    return sorted((distance_haversine_formula(lat, lon, rec[1], rec[2]), rec[0]) for rec in zip_data)
+
+
+class TestSpatialQueries(unittest.TestCase):
+
+    def test_within_radius_matches_brute_force(self):
+        for zip_code, radius in (('12180', 10), ('99950', 100), ('00501', 0)):
+            rec = find_by_zip(zip_code)
+            expected = [d for d, _ in brute_force(rec[1], rec[2]) if d <= radius]
+            found = find_within_radius(zip_code, radius)
+            self.assertEqual(len(found), len(expected))
+            for (_, actual), d in zip(found, expected):
+                self.assertAlmostEqual(actual, d, places=6)
+            self.assertIn(rec, [r for r, _ in found])
+
+    def test_within_radius_unknown_zip(self):
+        self.assertIsNone(find_within_radius('00000', 10))
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lon in ((42.67, -73.61), (21.3, -157.8), (-33.9, 151.2)):
+            expected = brute_force(lat, lon)[:7]
+            found = find_nearest(lat, lon, 7)
+            self.assertEqual(len(found), 7)
+            for (_, actual), (d, _) in zip(found, expected):
+                self.assertAlmostEqual(actual, d, places=6)
+
+    def test_small_index(self):
+        index = SpatialIndex([0.0, 0.0, 10.0], [0.0, 1.0, 0.0], leaf_size=1)
+        rows, miles = index.query_nearest(0.0, 0.9, 5)
+        self.assertEqual(rows.tolist(), [1, 0, 2])
+        self.assertEqual(index.query_radius(0.0, 0.0, 100)[0].tolist(), [0, 1])
+
+
+class TestBulkDistances(unittest.TestCase):
+
+    def setUp(self):
+        self.zips = [rec[0] for rec in zip_data[::1499]]
+
+    def scalar(self, z1, z2):
+        r1, r2 = find_by_zip(z1), find_by_zip(z2)
+        return distance_haversine_formula(r1[1], r1[2], r2[1], r2[2])
+
+    def test_vector_matches_scalar(self):
+        others = self.zips[::-1]
+        distances = distance_vector(self.zips, others)
+        for z1, z2, d in zip(self.zips, others, distances):
+            self.assertAlmostEqual(d, self.scalar(z1, z2), places=9)
+        self.assertEqual(distance_vector(self.zips, others, chunk=4).tolist(), distances.tolist())
+        self.assertEqual(distance_vector([], []).shape, (0,))
+
+    def test_matrix_matches_scalar_in_small_chunks(self):
+        matrix = distance_matrix(self.zips, self.zips[:7], chunk=10)
+        self.assertEqual(matrix.shape, (len(self.zips), 7))
+        for i, z1 in enumerate(self.zips):
+            for j, z2 in enumerate(self.zips[:7]):
+                self.assertAlmostEqual(matrix[i, j], self.scalar(z1, z2), places=9)
+
+    def test_unknown_zip_is_nan(self):
+        distances = distance_vector(['12180', '00000'], ['12180', '12180'])
+        self.assertEqual(distances[0], 0.0)
+        self.assertTrue(math.isnan(distances[1]))
+        with self.assertRaises(ValueError):
+            distance_vector(['12180'], [])
+
+    def test_coordinates(self):
+        points = [(0.0, 0.0, 0.0, 180.0), (10.0, 10.0, 10.0000001, 10.0), (42.67, -73.6, 55.5, -131.4)]
+        for point in points:
+            self.assertAlmostEqual(float(haversine_vector(*point)), distance_haversine_formula(*point), places=9)
+
+        lats, lons = [10.0, 20.0, 30.0], [-70.0, -80.0, -90.0]
+        matrix = haversine_matrix(lats, lons, lats[:2], lons[:2], chunk=1)
+        blocks = list(haversine_chunks(trig_table(lats, lons), trig_table(lats[:2], lons[:2]), chunk=2))
+        self.assertEqual([start for start, _ in blocks], [0, 1, 2])
+        for i in range(3):
+            self.assertEqual(matrix[i].tolist(), blocks[i][1][0].tolist())
+            for j in range(2):
+                self.assertAlmostEqual(matrix[i, j],
+                                       distance_haversine_formula(lats[i], lons[i], lats[j], lons[j]), places=9)
+
+
+class TestLazyLoading(unittest.TestCase):
+
+    def run_outside_repo(self, code):
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(zip_code_ex6.__file__)))
+        with tempfile.TemporaryDirectory() as cwd:
+            return subprocess.run([sys.executable, '-c', code], cwd=cwd, env=env,
+                                  capture_output=True, text=True, check=True).stdout.split()
+
+    def test_import_does_not_load_data(self):
+        code = ('import sys, zip_code_ex6 as z; '
+                'print(z._zip_data is None, "numpy" in sys.modules, z.decimal_to_dms(42.5))')
+        self.assertEqual(self.run_outside_repo(code), ['True', 'False', '042°30', '00.00"N'])
+
+    def test_first_query_loads_data_from_any_directory(self):
+        code = 'import zip_code_ex6 as z; print(z.find_by_zip("12180")[3], z._zip_data is not None)'
+        self.assertEqual(self.run_outside_repo(code), ['Troy', 'True'])
+
+    def test_loaded_once_across_threads(self):
+        saved = zip_code_ex6._zip_data
+        zip_code_ex6._zip_data = None
+        try:
+            barrier = threading.Barrier(8)
+            results = []
+
+            def query():
+                barrier.wait()
+                results.append(get_zip_data())
+
+            threads = [threading.Thread(target=query) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(results), 8)
+            self.assertTrue(all(data is results[0] for data in results))
+            self.assertIs(zip_code_ex6.zip_index, results[0].zip_index)
+        finally:
+            zip_code_ex6._zip_data = saved
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            zip_code_ex6.no_such_name
+
+
+class TestBatchMode(unittest.TestCase):
+
+    def test_csv(self):
+        lines = ['loc,12180\n', '\n', 'zip,troy,ny\n', 'dist,12180,99950\n', 'loc,00000\n',
+                 'dist,12180,00000\n', 'fly,12180\n', 'dist,12180\n']
+        out = io.StringIO()
+        self.assertEqual(run_batch(lines, out), 7)
+        self.assertEqual(out.getvalue().splitlines(), [
+            'loc,12180,Troy,NY,Rensselaer,42.673701,-73.608792,',
+            'zip,troy,ny,12179 12180 12181 12182 12183,',
+            'dist,12180,99950,2674.16,',
+            'loc,00000,,,,,,Invalid ZIP code',
+            'dist,12180,00000,,Invalid ZIP code(s)',
+            'fly,Invalid command',
+            'dist,,,,Invalid query',
+        ])
+
+    def test_jsonl(self):
+        queries = [{'cmd': 'dist', 'zip1': '12180', 'zip2': '99950'}, {'cmd': 'LOC', 'zip': '99950'},
+                   {'cmd': 'zip', 'city': 'Nowhere', 'state': 'NY'}, {'cmd': 'loc', 'zip': 12180}]
+        lines = [json.dumps(query) for query in queries] + ['not json']
+        out = io.StringIO()
+        self.assertEqual(run_batch(lines, out, 'jsonl'), 5)
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(results[0]['miles'], 2674.16)
+        self.assertEqual(results[1]['county'], 'Ketchikan Gateway')
+        self.assertEqual(results[2]['zips'], [])
+        self.assertEqual(results[3]['error'], 'Invalid query')
+        self.assertEqual(results[4]['error'], 'Invalid query')
+
+    def test_matches_scalar_in_blocks(self):
+        zips = [rec[0] for rec in zip_data[::97]]
+        lines = [f'dist,{z1},{z2}' for z1, z2 in zip(zips, zips[1:])]
+        out = io.StringIO()
+        saved = zip_code_ex6.BATCH_SIZE
+        zip_code_ex6.BATCH_SIZE = 7
+        try:
+            run_batch(lines, out)
+        finally:
+            zip_code_ex6.BATCH_SIZE = saved
+        for row, z1, z2 in zip(out.getvalue().splitlines(), zips, zips[1:]):
+            r1, r2 = find_by_zip(z1), find_by_zip(z2)
+            expected = distance_haversine_formula(r1[1], r1[2], r2[1], r2[2])
+            self.assertAlmostEqual(float(row.split(',')[3]), expected, delta=0.006)
+
+    def test_main_reports_throughput(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'queries.jsonl')
+            output = os.path.join(tmp, 'results.jsonl')
+            with open(source, 'w') as f:
+                f.write('{"cmd": "loc", "zip": "12180"}\n')
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                main(['--batch', source, '--output', output])
+            with open(output) as f:
+                self.assertEqual(json.loads(f.read())['city'], 'Troy')
+        self.assertRegex(stderr.getvalue(), r'^1 queries in [0-9.]+ s \([0-9,]+ queries/s\)')
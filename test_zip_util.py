@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.zip_util import (
+    CSV_FILE,
+    parse_zip_csv,
+    load_columns,
+    read_cache,
+    read_zip_all,
+    read_zip_dataset,
+)
+
+SAMPLE = '''"zip_code","latitude","longitude","city","state","county"
+"00501",40.922326,-72.637078,"Holtsville","NY","Suffolk"
+"00544",40.922326,-72.637078,"Holtsville","NY","Suffolk"
+"12180",42.673701,-73.608792,"Troy","NY","Rensselaer"
+"99999",,,"Nowhere","ZZ",""
+'''
+
+
+class TestZipCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.csv = os.path.join(self.tmp, 'zips.csv')
+        self.cache = os.path.join(self.tmp, 'zips.cache')
+        with open(self.csv, 'w') as f:
+            f.write(SAMPLE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_same_records_as_csv(self):
+        expected = parse_zip_csv(self.csv)
+        self.assertEqual(len(expected), 3)
+        self.assertEqual(read_zip_all(self.csv), expected)
+        self.assertTrue(os.path.exists(self.cache))
+        self.assertEqual(read_zip_all(self.csv), expected)
+
+    def test_full_dataset(self):
+        self.assertEqual(read_zip_all(), parse_zip_csv(CSV_FILE))
+
+    def test_cached_columns_are_memory_mapped(self):
+        load_columns(self.csv)
+        columns = load_columns(self.csv)
+        self.assertFalse(columns['latitude'].flags.writeable)
+        self.assertEqual(columns['zip'].tolist(), [501, 544, 12180])
+
+    def test_rebuilds_when_csv_changes(self):
+        load_columns(self.csv)
+        with open(self.csv, 'a') as f:
+            f.write('"12181",42.7,-73.6,"Troy","NY","Rensselaer"\n')
+        self.assertEqual(read_zip_all(self.csv)[-1], ['12181', 42.7, -73.6, 'Troy', 'NY', 'Rensselaer'])
+
+    def test_touched_csv_keeps_cache(self):
+        load_columns(self.csv)
+        stat = os.stat(self.csv)
+        os.utime(self.csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(len(load_columns(self.csv)['zip']), 3)
+        source, _ = read_cache(self.cache)
+        self.assertEqual(source['mtime_ns'], stat.st_mtime_ns + 10 ** 9)
+
+    def test_damaged_cache_is_rebuilt(self):
+        with open(self.cache, 'wb') as f:
+            f.write(b'garbage')
+        self.assertEqual(read_zip_all(self.csv), parse_zip_csv(self.csv))
+        with self.assertRaises(ValueError):
+            read_cache(os.path.join(self.tmp, 'zips.csv'))
+
+
+class TestZipDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.csv = os.path.join(self.tmp, 'zips.csv')
+        with open(self.csv, 'w') as f:
+            f.write(SAMPLE)
+        self.dataset = read_zip_dataset(self.csv)
+        self.records = parse_zip_csv(self.csv)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_rows_match_records(self):
+        self.assertEqual(len(self.dataset), 3)
+        self.assertEqual(list(self.dataset), self.records)
+        self.assertEqual(self.dataset[-1], self.records[-1])
+        self.assertEqual(self.dataset[0:2], self.records[0:2])
+        with self.assertRaises(IndexError):
+            self.dataset[3]
+
+    def test_row_view(self):
+        rec = self.dataset[2]
+        self.assertEqual(rec[0], '12180')
+        self.assertIsInstance(rec[1], float)
+        self.assertEqual(rec[-1], 'Rensselaer')
+        self.assertEqual(rec[1:3], [42.673701, -73.608792])
+        self.assertEqual(len(rec), 6)
+        self.assertIn('Troy', rec)
+        self.assertNotEqual(rec, self.records[0])
+        self.assertEqual(repr(rec), repr(self.records[2]))
+        with self.assertRaises(IndexError):
+            rec[6]
+
+    def test_columns(self):
+        self.assertEqual(self.dataset.column(0), ['00501', '00544', '12180'])
+        self.assertEqual(self.dataset.column(3), ['Holtsville', 'Holtsville', 'Troy'])
+        self.assertEqual(self.dataset.latitude.dtype.name, 'float64')
+        self.assertEqual(len(self.dataset.values['city']), 2)
+
+    def test_full_dataset_is_smaller(self):
+        dataset = read_zip_dataset()
+        self.assertEqual(dataset[4108], ['12180', 42.673701, -73.608792, 'Troy', 'NY', 'Rensselaer'])
+        self.assertLess(dataset.nbytes, 4 * 1024 * 1024)
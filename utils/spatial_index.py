@@ -0,0 +1,158 @@
+"""
+    Пространственный индекс точек на поверхности Земли.
+
+    Точки (широта, долгота) переводятся в трёхмерные координаты на
+    единичной сфере и раскладываются в k-d дерево. Расстояние по хорде
+    между точками сферы монотонно связано с расстоянием по дуге большого
+    круга, поэтому поиск по хорде даёт те же соседи, что и формула
+    Хаверсина, а найденные расстояния переводятся в мили точно.
+
+    index = SpatialIndex(lats, lons)
+    rows, miles = index.query_radius(42.67, -73.61, 10)
+    rows, miles = index.query_nearest(42.67, -73.61, 5)
+
+"""
+import numpy as np
+
+EARTH_RADIUS = 3959  # радиус Земли в милях, как в distance_haversine_formula
+
+
+def to_unit_vectors(lats, lons):
+    """
+    Переводит координаты в точки на единичной сфере.
+
+    :param lats: широты в десятичных градусах (число или массив)
+    :param lons: долготы в десятичных градусах (число или массив)
+    :return: np.ndarray, массив формы (..., 3)
+    """
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_miles(chord):
+    """
+    Переводит расстояние по хорде единичной сферы в мили по дуге.
+
+    :param chord: расстояние по хорде (число или массив)
+    :return: расстояние по дуге большого круга в милях
+    """
+    return EARTH_RADIUS * 2 * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0))
+
+
+def miles_to_chord(miles):
+    """
+    Переводит расстояние по дуге в милях в расстояние по хорде единичной сферы.
+
+    :param miles: float, расстояние в милях
+    :return: float, расстояние по хорде
+    """
+    return 2 * np.sin(min(miles / EARTH_RADIUS, np.pi) / 2)
+
+
+class SpatialIndex:
+    """
+    k-d дерево по точкам на единичной сфере.
+
+    Точки делятся пополам по медиане вдоль самой протяжённой оси, пока
+    в части не останется не больше leaf_size точек. Хранятся только листья:
+    диапазон точек в порядке дерева и ограничивающий параллелепипед.
+    Запрос отбирает листья по расстоянию до параллелепипедов одной
+    векторной операцией и проверяет их точки все вместе, без обхода
+    дерева в цикле Python.
+    """
+
+    def __init__(self, lats, lons, leaf_size=32):
+        """
+        :param lats: широты точек в десятичных градусах
+        :param lons: долготы точек в десятичных градусах
+        :param leaf_size: int, наибольшее число точек в листе
+        """
+        points = to_unit_vectors(lats, lons).reshape(-1, 3)
+        self.size = len(points)
+        self.order = np.arange(self.size)
+
+        leaves = []
+
+        def build(start, end):
+            part = points[self.order[start:end]]
+            if end - start <= leaf_size:
+                leaves.append(start)
+                return
+            axis = int(np.argmax(part.max(axis=0) - part.min(axis=0)))
+            middle = (end - start) // 2
+            self.order[start:end] = self.order[start:end][np.argpartition(part[:, axis], middle)]
+            build(start, start + middle)
+            build(start + middle, end)
+
+        if self.size:
+            build(0, self.size)
+        self.points = points[self.order]
+        self.starts = np.array(leaves, dtype=np.intp)
+        self.lengths = np.diff(np.append(self.starts, self.size))
+        self.lows = np.minimum.reduceat(self.points, self.starts) if self.size else np.empty((0, 3))
+        self.highs = np.maximum.reduceat(self.points, self.starts) if self.size else np.empty((0, 3))
+
+    def _box_distances(self, point):
+        """Квадраты расстояний от точки до параллелепипедов всех листьев."""
+        gap = np.maximum(np.maximum(self.lows - point, point - self.highs), 0.0)
+        return np.einsum('ij,ij->i', gap, gap)
+
+    def _gather(self, leaves, point):
+        """Номера точек выбранных листьев в порядке дерева и квадраты расстояний до них."""
+        starts, lengths = self.starts[leaves], self.lengths[leaves]
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.arange(lengths.sum()) + np.repeat(starts - offsets, lengths)
+        delta = self.points[positions] - point
+        return positions, np.einsum('ij,ij->i', delta, delta)
+
+    def query_radius(self, lat, lon, radius):
+        """
+        Находит все точки не дальше radius миль от заданной.
+
+        :param lat: float, широта в десятичных градусах
+        :param lon: float, долгота в десятичных градусах
+        :param radius: float, радиус в милях
+        :return: tuple (rows, miles): номера точек в исходном порядке
+                 и расстояния до них, по возрастанию расстояния
+        """
+        point = to_unit_vectors(lat, lon)
+        limit = miles_to_chord(radius) ** 2
+
+        positions, dist = self._gather(np.flatnonzero(self._box_distances(point) <= limit), point)
+        inside = dist <= limit
+        return self._result(positions[inside], dist[inside])
+
+    def query_nearest(self, lat, lon, k=1):
+        """
+        Находит k ближайших к заданной точек.
+
+        Сначала берутся ближайшие листья, в которых набирается k точек:
+        расстояние до k-й из них ограничивает поиск сверху. Затем
+        проверяются все листья, параллелепипед которых ближе этой границы.
+
+        :param lat: float, широта в десятичных градусах
+        :param lon: float, долгота в десятичных градусах
+        :param k: int, число соседей
+        :return: tuple (rows, miles): номера точек в исходном порядке
+                 и расстояния до них, по возрастанию расстояния
+        """
+        point = to_unit_vectors(lat, lon)
+        k = min(k, self.size)
+        if k <= 0:
+            return self._result(np.empty(0, dtype=np.intp), np.empty(0))
+
+        boxes = self._box_distances(point)
+        closest = np.argsort(boxes)
+        count = int(np.searchsorted(np.cumsum(self.lengths[closest]), k)) + 1
+        _, dist = self._gather(closest[:count], point)
+        bound = np.partition(dist, k - 1)[k - 1]
+
+        positions, dist = self._gather(np.flatnonzero(boxes <= bound), point)
+        keep = np.argpartition(dist, k - 1)[:k]
+        return self._result(positions[keep], dist[keep])
+
+    def _result(self, positions, dist):
+        order = np.argsort(dist, kind='stable')
+        return self.order[positions[order]], chord_to_miles(np.sqrt(dist[order]))
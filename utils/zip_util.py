@@ -11,20 +11,60 @@
     zip_codes = util.read_zip_all()
     print(zip_codes[4108])
 
+    or read_zip_dataset() to get the same records in a compact
+    columnar form (rows are read-only views with the same fields):
+
+    zip_codes = util.read_zip_dataset()
+    print(zip_codes[4108][3])
+
     Author: Konstantin Kuzmin
     Date: 2/19/2019
 
 """
 
 
-def read_zip_all():
+import hashlib
+import json
+import mmap
+import operator
+import os
+import struct
+import sys
+from collections.abc import Sequence
+
+import numpy as np
+
+CSV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'zip_codes_states.csv')
+
+CACHE_MAGIC = b'ZIPCACHE'
+CACHE_VERSION = 1
+CACHE_SUFFIX = '.cache'
+CACHE_PREFIX = struct.Struct('<8sI')  # сигнатура и длина JSON-заголовка
+CACHE_ALIGN = 64  # выравнивание массивов в файле кэша, байт
+ZIP_WIDTH = 5  # почтовые индексы хранятся числами и дополняются нулями до этой ширины
+TEXT_COLUMNS = ('city', 'state', 'county')
+RECORD_FIELDS = ('zip', 'latitude', 'longitude') + TEXT_COLUMNS  # порядок полей записи
+
+
+def parse_zip_csv(filename):
+    """
+    Разбирает CSV-файл с почтовыми индексами.
+
+    Строки с пустыми полями пропускаются, кавычки удаляются,
+    широта и долгота переводятся в float.
+
+    :param filename: str, путь к CSV-файлу
+    :return: list, записи [zip, latitude, longitude, city, state, county]
+    """
     i = 0
     header = []
     zip_codes = []
     zip_data = []
     skip_line = False
     # http://notebook.gaslampmedia.com/wp-content/uploads/2013/08/zip_codes_states.csv
-    for line in open('utils/zip_codes_states.csv').read().split("\n"):
+    with open(filename) as f:
+        lines = f.read().split("\n")
+    for line in lines:
         skip_line = False
         m = line.strip().replace('"', '').split(",")
         i += 1
@@ -47,6 +87,317 @@ def read_zip_all():
     return zip_codes
 
 
+def file_hash(filename):
+    """
+    :param filename: str, путь к файлу
+    :return: str, SHA-256 содержимого файла
+    """
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def encode_columns(records):
+    """
+    Раскладывает записи по столбцам для кэша.
+
+    Индексы хранятся целыми числами, координаты — float64, а город, штат
+    и округ — кодами в таблице уникальных строк (словарное кодирование);
+    тип кодов — наименьший беззнаковый, вмещающий число строк.
+
+    :param records: list, записи [zip, latitude, longitude, city, state, county]
+    :return: dict, имя столбца -> np.ndarray; для каждого текстового столбца
+             name — коды, name + '_values' — уникальные строки через '\\n' (uint8)
+    :raises ValueError: если почтовый индекс не из ZIP_WIDTH цифр
+    """
+    for rec in records:
+        if len(rec[0]) != ZIP_WIDTH or not rec[0].isdigit():
+            raise ValueError(f'ZIP code {rec[0]!r} is not {ZIP_WIDTH} digits')
+
+    columns = {
+        'zip': np.array([int(rec[0]) for rec in records], dtype=np.int32),
+        'latitude': np.array([rec[1] for rec in records], dtype=np.float64),
+        'longitude': np.array([rec[2] for rec in records], dtype=np.float64),
+    }
+    for position, name in enumerate(TEXT_COLUMNS, start=3):
+        values = {}
+        codes = [values.setdefault(rec[position], len(values)) for rec in records]
+        columns[name] = np.array(codes, dtype=np.min_scalar_type(max(len(values) - 1, 0)))
+        columns[name + '_values'] = np.frombuffer('\n'.join(values).encode(), dtype=np.uint8)
+    return columns
+
+
+def write_cache(filename, columns, source):
+    """
+    Атомарно записывает столбцы в двоичный файл кэша.
+
+    Файл: CACHE_PREFIX (сигнатура, длина заголовка), JSON-заголовок
+    (версия, сведения об исходном CSV, тип, форма и смещение каждого
+    массива), затем массивы, выровненные по CACHE_ALIGN байт, чтобы их
+    можно было отобразить в память без копирования.
+
+    :param filename: str, путь к файлу кэша
+    :param columns: dict, имя столбца -> np.ndarray
+    :param source: dict, сведения об исходном CSV (mtime_ns, size, sha256)
+    :return: None
+    :raises OSError: если файл не удалось записать
+    """
+    arrays = {}
+    offset = 0
+    for name, array in columns.items():
+        arrays[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += -(-array.nbytes // CACHE_ALIGN) * CACHE_ALIGN
+    header = json.dumps({'version': CACHE_VERSION, 'source': source, 'arrays': arrays}).encode()
+    start = -(-(CACHE_PREFIX.size + len(header)) // CACHE_ALIGN) * CACHE_ALIGN
+
+    temp = f'{filename}.{os.getpid()}.tmp'
+    try:
+        with open(temp, 'wb') as f:
+            f.write(CACHE_PREFIX.pack(CACHE_MAGIC, len(header)) + header)
+            for name, array in columns.items():
+                f.seek(start + arrays[name]['offset'])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate(start + offset)
+        os.replace(temp, filename)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def read_cache(filename):
+    """
+    Отображает файл кэша в память.
+
+    :param filename: str, путь к файлу кэша
+    :return: tuple (source, columns): сведения об исходном CSV и dict
+             имя столбца -> np.ndarray только для чтения поверх файла
+             (без копирования данных)
+    :raises ValueError: если файл повреждён или другой версии
+    :raises OSError: если файл не удалось открыть
+    """
+    with open(filename, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        magic, length = CACHE_PREFIX.unpack_from(data)
+        if magic != CACHE_MAGIC:
+            raise ValueError(f'{filename} is not a ZIP code cache')
+        header = json.loads(data[CACHE_PREFIX.size:CACHE_PREFIX.size + length])
+        if header.get('version') != CACHE_VERSION:
+            raise ValueError(f'{filename} has cache version {header.get("version")}')
+        start = -(-(CACHE_PREFIX.size + length) // CACHE_ALIGN) * CACHE_ALIGN
+
+        columns = {}
+        for name, info in header['arrays'].items():
+            dtype = np.dtype(info['dtype'])
+            count = int(np.prod(info['shape']))
+            columns[name] = np.frombuffer(data, dtype=dtype, count=count,
+                                          offset=start + info['offset']).reshape(info['shape'])
+    except (struct.error, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f'{filename} is damaged: {e}')
+    return header['source'], columns
+
+
+def load_columns(filename=CSV_FILE, cache=None):
+    """
+    Загружает данные о почтовых индексах в виде столбцов, используя кэш.
+
+    Кэш действителен, если у CSV-файла не изменились время изменения и размер,
+    или, если изменились, не изменился хеш содержимого. Иначе CSV разбирается
+    заново и кэш перезаписывается. Если кэш не удаётся записать (например,
+    каталог только для чтения), данные возвращаются без кэширования.
+
+    :param filename: str, путь к CSV-файлу
+    :param cache: str, путь к файлу кэша; по умолчанию — рядом с CSV с суффиксом CACHE_SUFFIX
+    :return: dict, столбцы (см. encode_columns)
+    """
+    cache = cache or os.path.splitext(filename)[0] + CACHE_SUFFIX
+    stat = os.stat(filename)
+    source = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    columns = None
+    try:
+        cached, columns = read_cache(cache)
+        if (cached['mtime_ns'], cached['size']) == (source['mtime_ns'], source['size']):
+            return columns
+        source['sha256'] = file_hash(filename)
+        if cached['sha256'] != source['sha256']:
+            columns = None
+    except (OSError, ValueError, KeyError, TypeError):
+        columns = None
+
+    if columns is None:
+        source.setdefault('sha256', file_hash(filename))
+        columns = encode_columns(parse_zip_csv(filename))
+    try:
+        write_cache(cache, columns, source)  # при совпавшем хеше обновляется только время изменения
+    except OSError:
+        pass
+    return columns
+
+
+def decode_text(values):
+    """
+    :param values: np.ndarray, uint8 — уникальные строки через '\\n'
+    :return: list[str], строки таблицы
+    """
+    return values.tobytes().decode().split('\n')
+
+
+def read_zip_all(filename=CSV_FILE):
+    """
+    Читает данные о почтовых индексах (через двоичный кэш, см. load_columns).
+
+    :param filename: str, путь к CSV-файлу
+    :return: list, записи [zip, latitude, longitude, city, state, county]
+    """
+    columns = load_columns(filename)
+    zips = [f'{code:0{ZIP_WIDTH}d}' for code in columns['zip'].tolist()]
+    texts = []
+    for name in TEXT_COLUMNS:
+        values = decode_text(columns[name + '_values'])
+        texts.append([values[code] for code in columns[name].tolist()])
+    return [list(rec) for rec in zip(zips, columns['latitude'].tolist(),
+                                     columns['longitude'].tolist(), *texts)]
+
+
+class ZipRecord(Sequence):
+    """
+    Строка ZipDataset. Поля читаются как у записи-списка,
+    rec[0]..rec[5] = zip, latitude, longitude, city, state, county,
+    но значения берутся из столбцов набора данных, а не хранятся в строке.
+    Запись равна списку или кортежу с теми же полями.
+    """
+
+    __slots__ = ('dataset', 'row')
+
+    def __init__(self, dataset, row):
+        """
+        :param dataset: ZipDataset, набор данных
+        :param row: int, номер строки
+        """
+        self.dataset = dataset
+        self.row = row
+
+    def __len__(self):
+        return len(RECORD_FIELDS)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.dataset.field(self.row, i) for i in range(*index.indices(len(RECORD_FIELDS)))]
+        return self.dataset.field(self.row, index)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, ZipRecord)):
+            return len(other) == len(RECORD_FIELDS) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class ZipDataset(Sequence):
+    """
+    Данные о почтовых индексах по столбцам.
+
+    Почтовые индексы хранятся числами int32, широта и долгота — массивами
+    float64, город, штат и округ — кодами в таблицах уникальных строк.
+    Столбцы обычно отображены в память из файла кэша (см. load_columns),
+    поэтому набор почти не занимает памяти процесса. Строки выдаются
+    представлениями ZipRecord, совместимыми с записями read_zip_all.
+    """
+
+    def __init__(self, columns):
+        """
+        :param columns: dict, столбцы (см. encode_columns)
+        """
+        self.zips = columns['zip']
+        self.latitude = columns['latitude']
+        self.longitude = columns['longitude']
+        self.codes = {name: columns[name] for name in TEXT_COLUMNS}
+        self.values = {name: decode_text(columns[name + '_values']) for name in TEXT_COLUMNS}
+
+    def __len__(self):
+        return len(self.zips)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ZipRecord(self, row) for row in range(*index.indices(len(self)))]
+        row = operator.index(index)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError('ZIP dataset index out of range')
+        return ZipRecord(self, row)
+
+    def __iter__(self):
+        return (ZipRecord(self, row) for row in range(len(self)))
+
+    def field(self, row, index):
+        """
+        :param row: int, номер строки
+        :param index: int, номер поля как в записи [zip, latitude, longitude, city, state, county]
+        :return: значение поля
+        :raises IndexError: если поля с таким номером нет
+        """
+        name = RECORD_FIELDS[index]
+        if name == 'zip':
+            return f'{self.zips[row]:0{ZIP_WIDTH}d}'
+        if name == 'latitude':
+            return float(self.latitude[row])
+        if name == 'longitude':
+            return float(self.longitude[row])
+        return self.values[name][self.codes[name][row]]
+
+    def column(self, index, rows=None):
+        """
+        :param index: int, номер поля как в записи [zip, latitude, longitude, city, state, county]
+        :param rows: номера строк (список или np.ndarray); по умолчанию — все строки
+        :return: list, значения поля в этих строках
+        """
+        name = RECORD_FIELDS[index]
+        if name == 'zip':
+            array = self.zips
+        elif name in TEXT_COLUMNS:
+            array = self.codes[name]
+        else:
+            array = getattr(self, name)
+        if rows is not None:
+            array = array.take(np.asarray(rows, dtype=np.intp))
+
+        if name == 'zip':
+            return ['%0*d' % (ZIP_WIDTH, code) for code in array.tolist()]
+        if name in TEXT_COLUMNS:
+            values = self.values[name]
+            return [values[code] for code in array.tolist()]
+        return array.tolist()
+
+    @property
+    def nbytes(self):
+        """
+        :return: int, объём данных набора в байтах: массивы столбцов
+                 и объекты строк в таблицах уникальных значений
+        """
+        arrays = [self.zips, self.latitude, self.longitude, *self.codes.values()]
+        strings = [value for values in self.values.values() for value in values]
+        return (sum(array.nbytes for array in arrays)
+                + sum(sys.getsizeof(values) for values in self.values.values())
+                + sum(sys.getsizeof(value) for value in strings))
+
+
+def read_zip_dataset(filename=CSV_FILE):
+    """
+    Читает данные о почтовых индексах в столбцовом виде (через двоичный кэш).
+
+    :param filename: str, путь к CSV-файлу
+    :return: ZipDataset, записи в том же порядке, что и у read_zip_all
+    """
+    return ZipDataset(load_columns(filename))
+
+
 if __name__ == "__main__":
     zip_codes = read_zip_all()
     # del zip_codes[3]
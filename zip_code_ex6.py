@@ -1,7 +1,157 @@
+import csv
+import itertools
+import json
 import math
-import utils.zip_util
+import sys
+import threading
+import time
 
-zip_data = utils.zip_util.read_zip_all()
+from utils.float_input_checker import float_data_reader
+
+# NumPy и модули данных (utils.zip_util, utils.spatial_index) импортируются
+# внутри функций: импорт этого модуля не должен загружать ни их, ни данные.
+
+
+
+def build_indexes(records):
+    """
+    Строит индексы для поиска записей за O(1).
+
+    :param records: list или utils.zip_util.ZipDataset,
+                    записи [zip, latitude, longitude, city, state, county]
+    :return: tuple (zip_index, city_index):
+             zip_index — dict, почтовый индекс -> запись (при повторах — первая),
+             city_index — dict, (город, штат) в casefold -> список почтовых индексов
+                          в порядке записей
+    """
+
+    import utils.zip_util
+
+    if isinstance(records, utils.zip_util.ZipDataset):
+        # поля берутся столбцами целиком, а не через представления строк
+        keys = zip(records.column(0), records.column(3), records.column(4))
+    else:
+        keys = ((rec[0], rec[3], rec[4]) for rec in records)
+
+    zip_index = {}
+    city_index = {}
+    for rec, (zip_code, city, state) in zip(records, keys):
+        zip_index.setdefault(zip_code, rec)
+        city_index.setdefault((city.casefold(), state.casefold()), []).append(zip_code)
+    return zip_index, city_index
+
+
+def coordinate_table(dataset):
+    """
+    Один раз вычисляет для записей всё, что нужно пакетному расчёту расстояний.
+
+    :param dataset: utils.zip_util.ZipDataset, данные о почтовых индексах
+    :return: tuple (rows, coords): rows — dict, почтовый индекс -> номер записи
+             (при повторах — первой); coords — np.ndarray формы (5, n),
+             см. trig_table
+    """
+
+    rows = {}
+    for row, zip_code in enumerate(dataset.column(0)):
+        rows.setdefault(zip_code, row)
+    return rows, trig_table(dataset.latitude, dataset.longitude)
+
+
+def trig_table(lats, lons):
+    """
+    Переводит координаты в радианы и вычисляет их тригонометрические функции.
+
+    Синусы и косинусы половинных углов позволяют найти sin((lat2 - lat1) / 2)
+    по формуле синуса разности без вызова sin для каждой пары точек.
+
+    :param lats: широты в десятичных градусах
+    :param lons: долготы в десятичных градусах
+    :return: np.ndarray формы (5, n): sin и cos половины широты,
+             sin и cos половины долготы, cos широты; каждая величина
+             лежит в памяти непрерывно, что важно для скорости расчёта
+    """
+
+    import numpy as np
+
+    lat = np.radians(np.asarray(lats, dtype=np.float64).reshape(-1))
+    lon = np.radians(np.asarray(lons, dtype=np.float64).reshape(-1))
+    return np.stack([np.sin(lat / 2), np.cos(lat / 2),
+                     np.sin(lon / 2), np.cos(lon / 2), np.cos(lat)])
+
+
+EARTH_RADIUS = 3959  # константа, радиус Земли в милях
+DISTANCE_CHUNK = 1 << 16  # элементов в одном блоке расчёта расстояний (блок помещается в кэш)
+
+
+class ZipData:
+    """
+    Данные о почтовых индексах вместе с индексами для поиска.
+
+    Создаётся один раз, при первом запросе (см. get_zip_data).
+    """
+
+    def __init__(self, filename=None):
+        """
+        :param filename: str, путь к CSV-файлу; по умолчанию — файл
+                         из пакета utils (utils.zip_util.CSV_FILE)
+        """
+        import utils.zip_util
+        import utils.spatial_index
+
+        self.dataset = utils.zip_util.read_zip_dataset(filename or utils.zip_util.CSV_FILE)
+        self.zip_index, self.city_index = build_indexes(self.dataset)
+        self.zip_rows, self.zip_coords = coordinate_table(self.dataset)
+        self.spatial_index = utils.spatial_index.SpatialIndex(self.dataset.latitude, self.dataset.longitude)
+
+
+_zip_data = None
+_zip_data_lock = threading.Lock()
+
+# прежние глобальные переменные модуля -> атрибуты ZipData
+_LAZY_ATTRIBUTES = {
+    'zip_data': 'dataset',
+    'zip_index': 'zip_index',
+    'city_index': 'city_index',
+    'zip_rows': 'zip_rows',
+    'zip_coords': 'zip_coords',
+    'spatial_index': 'spatial_index',
+}
+
+
+def get_zip_data():
+    """
+    Возвращает общие для всего процесса данные о почтовых индексах,
+    загружая их при первом вызове. Безопасна при вызове из нескольких
+    потоков: данные загружаются ровно один раз.
+
+    :return: ZipData
+    """
+
+    global _zip_data
+    if _zip_data is None:
+        with _zip_data_lock:
+            if _zip_data is None:
+                _zip_data = ZipData()
+    return _zip_data
+
+
+def warm_up():
+    """
+    Загружает данные заранее, чтобы первый запрос не ждал загрузки
+    (например, при запуске сервера).
+
+    :return: None
+    """
+
+    get_zip_data()
+
+
+def __getattr__(name):
+    # zip_data, zip_index и т. п. остаются доступны как атрибуты модуля,
+    # но данные загружаются только при первом обращении
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(get_zip_data(), _LAZY_ATTRIBUTES[name])
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 def find_by_zip(zip_code):
@@ -14,26 +164,54 @@ def find_by_zip(zip_code):
              или None, если индекс не найден
     """
 
-    for code in zip_data:
-        if code[0] == zip_code:
-            return code
-    return None
+    return get_zip_data().zip_index.get(zip_code)
 
 
 def find_by_city(city, state):
     """
-    Находит все почтовые индексы для указанного города и штата.
+    Находит все почтовые индексы для указанного города и штата
+    (без учёта регистра).
 
     :param city: str, название города
     :param state: str, аббревиатура штата
     :return: list[str], список найденных почтовых индексов
     """
 
-    result = []
-    for data in zip_data:
-        if data[3].lower() == city.lower() and data[4].lower() == state.lower():
-            result.append(data[0])
-    return result
+    return list(get_zip_data().city_index.get((city.casefold(), state.casefold()), ()))
+
+
+def find_within_radius(zip_code, radius):
+    """
+    Находит все почтовые индексы не дальше radius миль от заданного
+    (включая сам индекс).
+
+    :param zip_code: str, почтовый индекс центра
+    :param radius: float, радиус в милях
+    :return: list[tuple], пары (запись, расстояние в милях) по возрастанию расстояния
+             или None, если индекс не найден
+    """
+
+    rec = find_by_zip(zip_code)
+    if rec is None:
+        return None
+    data = get_zip_data()
+    rows, miles = data.spatial_index.query_radius(rec[1], rec[2], radius)
+    return [(data.dataset[row], float(d)) for row, d in zip(rows, miles)]
+
+
+def find_nearest(lat, lon, k=5):
+    """
+    Находит k почтовых индексов, ближайших к точке.
+
+    :param lat: float, широта в десятичных градусах
+    :param lon: float, долгота в десятичных градусах
+    :param k: int, число индексов
+    :return: list[tuple], пары (запись, расстояние в милях) по возрастанию расстояния
+    """
+
+    data = get_zip_data()
+    rows, miles = data.spatial_index.query_nearest(lat, lon, k)
+    return [(data.dataset[row], float(d)) for row, d in zip(rows, miles)]
 
 
 def distance_haversine_formula(lat1, lon1, lat2, lon2):
@@ -46,8 +224,6 @@ def distance_haversine_formula(lat1, lon1, lat2, lon2):
     :param lon2: float, долгота второй точки в десятичных градусах
     :return: float, расстояние между точками в милях
     """
-    EARTH_RADIUS = 3959  # константа, радиус Земли в милях
-
     lat1 = math.radians(lat1)
     lon1 = math.radians(lon1)
     lat2 = math.radians(lat2)
@@ -62,6 +238,165 @@ def distance_haversine_formula(lat1, lon1, lat2, lon2):
     theta = 2 * math.asin(math.sqrt(a))
     return EARTH_RADIUS * theta
 
+
+def _haversine(first, second, out=None):
+    # формула та же, что в distance_haversine_formula; синусы полуразностей —
+    # по формуле синуса разности из заранее вычисленных trig_table.
+    # Операции выполняются на месте, чтобы не выделять память под каждый промежуточный массив
+    import numpy as np
+
+    s_lat1, c_lat1, s_lon1, c_lon1, cos1 = first
+    s_lat2, c_lat2, s_lon2, c_lon2, cos2 = second
+    a = np.multiply(s_lat2, c_lat1, out=out)
+    b = c_lat2 * s_lat1
+    a -= b
+    a *= a  # sin(dlat / 2) ** 2
+    np.multiply(s_lon2, c_lon1, out=b)
+    c = c_lon2 * s_lon1
+    b -= c
+    b *= b  # sin(dlon / 2) ** 2
+    np.multiply(cos1, cos2, out=c)
+    b *= c
+    a += b
+    np.minimum(a, 1.0, out=a)
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    a *= 2 * EARTH_RADIUS
+    return a
+
+
+def _zip_row_numbers(zip_codes):
+    """Номера записей для списка индексов (np.intp); -1 для неизвестных."""
+    import numpy as np
+
+    rows = get_zip_data().zip_rows
+    return np.fromiter((rows.get(code, -1) for code in zip_codes), dtype=np.intp, count=len(zip_codes))
+
+
+def _row_trig(rows):
+    """Столбцы trig_table для номеров записей; NaN для номера -1."""
+    import numpy as np
+
+    coords = get_zip_data().zip_coords.take(np.maximum(rows, 0), axis=1)
+    coords[:, rows < 0] = np.nan
+    return coords
+
+
+def _zip_trig(zip_codes):
+    """Столбцы trig_table для списка индексов; NaN для неизвестных."""
+    return _row_trig(_zip_row_numbers(zip_codes))
+
+
+def haversine_vector(lats1, lons1, lats2, lons2):
+    """
+    Вычисляет расстояния между парами точек по формуле Хаверсина.
+
+    Векторный вариант distance_haversine_formula: массивы координат
+    сопоставляются поэлементно (по правилам broadcasting NumPy).
+
+    :param lats1: широты первых точек в десятичных градусах
+    :param lons1: долготы первых точек в десятичных градусах
+    :param lats2: широты вторых точек в десятичных градусах
+    :param lons2: долготы вторых точек в десятичных градусах
+    :return: np.ndarray, расстояния в милях
+    """
+
+    import numpy as np
+
+    lats1, lons1, lats2, lons2 = np.broadcast_arrays(lats1, lons1, lats2, lons2)
+    return _haversine(trig_table(lats1, lons1), trig_table(lats2, lons2)).reshape(lats1.shape)
+
+
+def haversine_chunks(first, second, chunk=DISTANCE_CHUNK):
+    """
+    Вычисляет матрицу расстояний блоками строк.
+
+    В памяти одновременно находится один блок (не больше chunk элементов,
+    но хотя бы одна строка), поэтому матрицу для больших наборов точек можно
+    обрабатывать по частям, не храня её целиком.
+
+    :param first: np.ndarray формы (5, N), trig_table первых точек
+    :param second: np.ndarray формы (5, M), trig_table вторых точек
+    :param chunk: int, наибольшее число элементов в блоке
+    :return: генератор пар (start, block): block — расстояния в милях
+             от точек first[start:start + len(block)] до всех точек second
+    """
+
+    for start, stop in _chunk_bounds(first.shape[1], second.shape[1], chunk):
+        yield start, _haversine(first[:, start:stop, None], second)
+
+
+def _chunk_bounds(rows, columns, chunk):
+    step = max(1, chunk // max(1, columns))
+    for start in range(0, rows, step):
+        yield start, min(start + step, rows)
+
+
+def haversine_matrix(lats1, lons1, lats2, lons2, chunk=DISTANCE_CHUNK):
+    """
+    Вычисляет матрицу расстояний N x M между двумя наборами точек.
+
+    :param lats1: широты N точек в десятичных градусах
+    :param lons1: долготы N точек в десятичных градусах
+    :param lats2: широты M точек в десятичных градусах
+    :param lons2: долготы M точек в десятичных градусах
+    :param chunk: int, наибольшее число элементов во временных массивах
+    :return: np.ndarray формы (N, M), расстояния в милях
+    """
+
+    return _fill_matrix(trig_table(lats1, lons1), trig_table(lats2, lons2), chunk)
+
+
+def _fill_matrix(first, second, chunk):
+    import numpy as np
+
+    result = np.empty((first.shape[1], second.shape[1]))
+    for start, stop in _chunk_bounds(first.shape[1], second.shape[1], chunk):
+        _haversine(first[:, start:stop, None], second, out=result[start:stop])
+    return result
+
+
+def distance_vector(zips1, zips2, chunk=DISTANCE_CHUNK):
+    """
+    Вычисляет расстояния между парами почтовых индексов.
+
+    Используются координаты, переведённые в радианы при загрузке данных.
+    Индексы один раз переводятся в номера записей, а координаты выбираются
+    и обрабатываются блоками по chunk пар прямо в массив результата,
+    так что все временные массивы не больше одного блока.
+
+    :param zips1: list[str], первые индексы пар
+    :param zips2: list[str], вторые индексы пар (той же длины)
+    :param chunk: int, наибольшее число пар в блоке
+    :return: np.ndarray, расстояния в милях; NaN, если индекс не найден
+    :raises ValueError: если списки разной длины
+    """
+
+    import numpy as np
+
+    if len(zips1) != len(zips2):
+        raise ValueError(f'Lengths differ: {len(zips1)} and {len(zips2)}')
+    rows1, rows2 = _zip_row_numbers(zips1), _zip_row_numbers(zips2)
+    result = np.empty(len(rows1))
+    for start, stop in _chunk_bounds(len(rows1), 1, chunk):
+        _haversine(_row_trig(rows1[start:stop]), _row_trig(rows2[start:stop]), out=result[start:stop])
+    return result
+
+
+def distance_matrix(zips1, zips2, chunk=DISTANCE_CHUNK):
+    """
+    Вычисляет матрицу расстояний между двумя списками почтовых индексов.
+
+    :param zips1: list[str], N индексов (строки матрицы)
+    :param zips2: list[str], M индексов (столбцы матрицы)
+    :param chunk: int, наибольшее число элементов во временных массивах
+    :return: np.ndarray формы (N, M), расстояния в милях;
+             NaN в строках и столбцах ненайденных индексов
+    """
+
+    return _fill_matrix(_zip_trig(zips1), _zip_trig(zips2), chunk)
+
+
 def decimal_to_dms(value, is_lat=True):
     """
     Преобразует координату из десятичных градусов
@@ -101,18 +436,23 @@ def print_coordinates(lat, lon):
         f"({decimal_to_dms(lat, True)}, {decimal_to_dms(lon, False)})"
     )
 
+PROMPT = "Command ('loc', 'zip', 'dist', 'near', 'nearest', 'end') => "
+
+
 def repl():
     """
     Поддерживаемые команды:
     - loc — поиск местоположения по почтовому индексу
     - zip — поиск почтовых индексов по городу и штату
     - dist — вычисление расстояния между двумя почтовыми индексами
+    - near — почтовые индексы в радиусе от заданного
+    - nearest — ближайшие почтовые индексы к точке
     - end — завершение работы программы
 
     :return: None
     """
 
-    print("Command ('loc', 'zip', 'dist', 'end') => ", end='')
+    print(PROMPT, end='')
 
     while True:
         cmd = input().strip().lower()
@@ -150,11 +490,248 @@ def repl():
             else:
                 print('Invalid ZIP code(s)')
 
+        elif cmd == 'near':
+            zip_code = input('Enter a ZIP Code => ').strip()
+            radius = float_data_reader('Enter the radius in miles => ', min_value=0)
+            found = find_within_radius(zip_code, radius)
+            if found is None:
+                print('Invalid ZIP code')
+            else:
+                print(f'{len(found)} ZIP Code(s) within {radius:g} miles of {zip_code}:')
+                for rec, d in found:
+                    print(f'{rec[0]} {rec[3]}, {rec[4]} ({d:.2f} miles)')
+
+        elif cmd == 'nearest':
+            lat = float_data_reader('Enter the latitude => ', min_value=-90, max_value=90)
+            lon = float_data_reader('Enter the longitude => ', min_value=-180, max_value=180)
+            k = int(float_data_reader('Enter the number of ZIP Codes => ', min_value=1))
+            print_coordinates(lat, lon)
+            for rec, d in find_nearest(lat, lon, k):
+                print(f'{rec[0]} {rec[3]}, {rec[4]} ({d:.2f} miles)')
+
         else:
             print('Invalid command, ignoring')
 
-        print("\nCommand ('loc', 'zip', 'dist', 'end') => ", end='')
+        print('\n' + PROMPT, end='')
+
+
+BATCH_SIZE = 10000  # строк запросов, обрабатываемых и записываемых за один раз
+
+# поля запросов пакетного режима: команда -> имена аргументов
+QUERY_FIELDS = {
+    'loc': ('zip',),
+    'zip': ('city', 'state'),
+    'dist': ('zip1', 'zip2'),
+}
+
+# столбцы результатов в CSV: команда -> поля; столбец error пуст, если запрос выполнен
+RESULT_COLUMNS = {
+    'loc': ('cmd', 'zip', 'city', 'state', 'county', 'latitude', 'longitude', 'error'),
+    'zip': ('cmd', 'city', 'state', 'zips', 'error'),
+    'dist': ('cmd', 'zip1', 'zip2', 'miles', 'error'),
+}
+UNKNOWN_COLUMNS = ('cmd', 'error')  # для неизвестной команды
+
+
+def parse_queries(lines, fmt):
+    """
+    Разбирает строки запросов пакетного режима. Пустые строки пропускаются.
+
+    CSV: loc,<zip> | zip,<город>,<штат> | dist,<zip1>,<zip2>
+    JSONL: {"cmd": "loc", "zip": ...} | {"cmd": "zip", "city": ..., "state": ...} |
+           {"cmd": "dist", "zip1": ..., "zip2": ...}
+
+    :param lines: list[str], строки входных данных
+    :param fmt: str, 'csv' или 'jsonl'
+    :return: list[dict], команда ('cmd') и её аргументы по QUERY_FIELDS;
+             для ошибочной строки — с полем 'error'
+    """
+
+    queries = []
+    if fmt == 'jsonl':
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                query = json.loads(line)
+                cmd = str(query.get('cmd', ''))
+                args = [query.get(name) for name in QUERY_FIELDS.get(cmd.strip().lower(), ())]
+            except (ValueError, AttributeError):
+                queries.append({'cmd': '', 'error': 'Invalid query'})
+                continue
+            queries.append(_make_query(cmd, args))
+    else:
+        for fields in csv.reader(lines):
+            if fields and any(field.strip() for field in fields):
+                queries.append(_make_query(fields[0], fields[1:]))
+    return queries
+
+
+def _make_query(cmd, args):
+    cmd = cmd.strip().lower()
+    names = QUERY_FIELDS.get(cmd)
+    if names is None:
+        return {'cmd': cmd, 'error': 'Invalid command'}
+    if len(args) != len(names) or not all(isinstance(arg, str) for arg in args):
+        return {'cmd': cmd, 'error': 'Invalid query'}
+    query = {'cmd': cmd}
+    query.update(zip(names, map(str.strip, args)))
+    return query
+
+
+def resolve_queries(queries):
+    """
+    Выполняет запросы пакетного режима.
+
+    Запросы группируются по командам: записи для всех запросов loc
+    выбираются из столбцов набора данных разом, расстояния для всех
+    запросов dist вычисляются одним вызовом distance_vector.
+
+    :param queries: list[dict], запросы (см. parse_queries); дополняются результатами
+    :return: list[dict], те же словари в порядке запросов: поля запроса и
+             найденные значения или поле 'error'
+    """
+
+    results = queries
+    groups = {cmd: [] for cmd in QUERY_FIELDS}
+    for result in results:
+        if 'error' not in result:
+            groups[result['cmd']].append(result)
+
+    data = get_zip_data()
+    found = []
+    for result in groups['loc']:
+        row = data.zip_rows.get(result['zip'])
+        if row is None:
+            result['error'] = 'Invalid ZIP code'
+        else:
+            found.append((result, row))
+    if found:
+        rows = [row for _, row in found]
+        columns = zip(*(data.dataset.column(index, rows) for index in (3, 4, 5, 1, 2)))
+        for (result, _), (city, state, county, lat, lon) in zip(found, columns):
+            result.update(city=city, state=state, county=county, latitude=lat, longitude=lon)
+
+    for result in groups['zip']:
+        result['zips'] = find_by_city(result['city'], result['state'])
+
+    if groups['dist']:
+        dist = groups['dist']
+        miles = distance_vector([r['zip1'] for r in dist], [r['zip2'] for r in dist])
+        for result, d in zip(dist, miles.tolist()):
+            if math.isnan(d):
+                result['error'] = 'Invalid ZIP code(s)'
+            else:
+                result['miles'] = round(d, 2)
+    return results
+
+
+def write_results(results, out, fmt):
+    """
+    Записывает результаты пакетного режима одной операцией записи.
+
+    CSV: строка с постоянным для каждой команды набором столбцов
+    RESULT_COLUMNS (список индексов команды zip — через пробел); последний
+    столбец — текст ошибки, пустой при успешном запросе, остальные значения
+    при ошибке пусты, если не известны. JSONL: результат целиком, поле
+    'error' — только при ошибке.
+
+    :param results: list[dict], результаты (см. resolve_queries)
+    :param out: текстовый файл для записи
+    :param fmt: str, 'csv' или 'jsonl'
+    :return: None
+    """
+
+    if fmt == 'jsonl':
+        out.write(''.join(json.dumps(result) + '\n' for result in results))
+        return
+    rows = []
+    for result in results:
+        row = [result.get(name, '') for name in RESULT_COLUMNS.get(result['cmd'], UNKNOWN_COLUMNS)]
+        rows.append([' '.join(value) if isinstance(value, list) else value for value in row])
+    csv.writer(out, lineterminator='\n').writerows(rows)
+
+
+def run_batch(lines, out, fmt='csv'):
+    """
+    Пакетный режим: выполняет запросы из строк входных данных и записывает
+    результаты. Строки читаются и обрабатываются блоками по BATCH_SIZE.
+
+    :param lines: итерируемый объект строк (файл, sys.stdin, список)
+    :param out: текстовый файл для записи результатов
+    :param fmt: str, формат входных и выходных данных: 'csv' или 'jsonl'
+    :return: int, число выполненных запросов
+    """
+
+    count = 0
+    lines = iter(lines)
+    while True:
+        block = list(itertools.islice(lines, BATCH_SIZE))
+        if not block:
+            return count
+        queries = parse_queries(block, fmt)
+        write_results(resolve_queries(queries), out, fmt)
+        count += len(queries)
+
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Поиск по почтовым индексам США: интерактивно или пакетом запросов'
+    )
+
+    parser.add_argument(
+        '--batch',
+        metavar='FILE',
+        help="Файл с запросами loc/zip/dist ('-' — стандартный ввод); без него — интерактивный режим"
+    )
+
+    parser.add_argument(
+        '--format',
+        choices=('csv', 'jsonl'),
+        help='Формат запросов и результатов (по умолчанию — по расширению файла, иначе csv)'
+    )
+
+    parser.add_argument(
+        '--output',
+        metavar='FILE',
+        default='-',
+        help="Файл для результатов ('-' — стандартный вывод)"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Запуск программы
+
+    :param argv: list[str], аргументы командной строки (по умолчанию sys.argv)
+    :return: None
+    """
+
+    args = parse_args(argv)
+    warm_up()
+    if args.batch is None:
+        repl()
+        return
+
+    fmt = args.format or ('jsonl' if args.batch.endswith(('.jsonl', '.json')) else 'csv')
+    source = sys.stdin if args.batch == '-' else open(args.batch, newline='')
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', buffering=1 << 20)
+    try:
+        start = time.perf_counter()
+        count = run_batch(source, out, fmt)
+        out.flush()
+        elapsed = time.perf_counter() - start
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    print(f'{count} queries in {elapsed:.3f} s ({count / max(elapsed, 1e-9):,.0f} queries/s)', file=sys.stderr)
 
 
 if __name__ == '__main__':
-    repl()
+    main()